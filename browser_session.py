@@ -0,0 +1,83 @@
+"""
+Browser session with a crash watchdog.
+
+If Chromium dies or a page hangs mid-run, every later page.goto times out
+(60 s x 3 retries per item) until the run ends. BrowserSession owns the
+Playwright instance, context and page returned by config.configure_browser,
+and after a few consecutive failures runs a fast liveness probe. If the probe
+fails, the context is relaunched in place.
+
+Callers hold `session.page`, a proxy that always points at the current page,
+so code that was handed the page before a relaunch keeps working. The run's
+in-memory cache, queue and journal are untouched by a relaunch.
+"""
+
+import config
+
+
+def page_is_alive(page, timeout=None):
+    """Fast liveness probe: navigate to about:blank within a short timeout."""
+    try:
+        page.goto("about:blank", timeout=timeout or config.WATCHDOG_PROBE_TIMEOUT)
+        return True
+    except Exception:
+        return False
+
+
+class PageProxy:
+    """Forwards attribute access to the session's current page."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session.current_page, name)
+
+
+class BrowserSession:
+    """Playwright browser session that can restart itself after a crash or hang."""
+
+    def __init__(self, headless=True, prompt_login=False, session_mode=None):
+        self.headless = headless
+        self.session_mode = session_mode
+        self.relaunches = 0
+        self.consecutive_failures = 0
+        self.playwright, self.context, self.current_page, self.is_logged_in = config.configure_browser(
+            headless=headless, prompt_login=prompt_login, session_mode=session_mode)
+        self.page = PageProxy(self)
+
+    def close(self):
+        """Close the context and stop Playwright, ignoring errors from a dead browser."""
+        for close in (self.context.close, self.playwright.stop):
+            try:
+                close()
+            except Exception:
+                pass
+
+    def relaunch(self):
+        """Tear down the current browser and start a fresh context on the same profile."""
+        print("  🔄 Browser not responding - restarting it...")
+        self.close()
+        self.playwright, self.context, self.current_page, self.is_logged_in = config.configure_browser(
+            headless=self.headless, session_mode=self.session_mode)
+        self.relaunches += 1
+        self.consecutive_failures = 0
+        print(f"  🔄 Browser restarted (logged in: {self.is_logged_in})")
+
+    def note_result(self, success):
+        """
+        Record the outcome of a Steam request. After WATCHDOG_FAILURE_THRESHOLD
+        failures in a row, probe the page and relaunch if it is dead or hung.
+        Returns True if the browser was relaunched.
+        """
+        if success:
+            self.consecutive_failures = 0
+            return False
+        self.consecutive_failures += 1
+        if self.consecutive_failures < config.WATCHDOG_FAILURE_THRESHOLD:
+            return False
+        self.consecutive_failures = 0
+        if page_is_alive(self.current_page):
+            return False
+        self.relaunch()
+        return True
@@ -0,0 +1,246 @@
+"""
+Collection state kept on disk: locked collections, per-tag item cache,
+provisioned collections, persistently failed items and the add journal.
+
+Only plain files are touched here (no browser), so quick commands like
+`auto_update_all.py status` can import this module without Playwright.
+
+Each configured game has its own set of files (see config.use_app and
+use_data_dir); locked collections are shared, since collection IDs are unique.
+
+Several worker processes may update the same files at once, so every
+read-modify-write holds the state lock (file_lock) and files are replaced
+atomically (write-then-rename).
+"""
+
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+import config
+
+CACHE_DIR = config.CACHE_DIR
+LOCKED_FILE = os.path.join(config.BASE_DIR, "locked_collections.json")
+FAILED_FILE = os.path.join(config.BASE_DIR, "failed_items.json")
+# One journal file per tag, so worker processes on different tags never rewrite each other's
+ADD_JOURNAL_DIR = os.path.join(config.BASE_DIR, "add_journal")
+# Single-file journal written by earlier versions; still read (and cleared) on resume
+ADD_JOURNAL_FILE = os.path.join(config.BASE_DIR, "add_journal.json")
+
+
+def use_data_dir(data_dir):
+    """Point the per-game state files (cache, failed items, journal) at data_dir."""
+    global CACHE_DIR, FAILED_FILE, ADD_JOURNAL_DIR, ADD_JOURNAL_FILE
+    CACHE_DIR = os.path.join(data_dir, "cache")
+    FAILED_FILE = os.path.join(data_dir, "failed_items.json")
+    ADD_JOURNAL_DIR = os.path.join(data_dir, "add_journal")
+    ADD_JOURNAL_FILE = os.path.join(data_dir, "add_journal.json")
+
+
+def activate_app(app_id):
+    """Switch config and the state files (cache, journal, failed items) to another configured game."""
+    use_data_dir(config.use_app(app_id))
+
+
+@contextmanager
+def file_lock(path=None, timeout=600):
+    """Hold an exclusive lock across processes (a write transaction on a small SQLite file) while inside the block."""
+    conn = sqlite3.connect(path or config.STATE_LOCK_PATH, timeout=timeout, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        finally:
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+
+def _write_json(path, data, **kwargs):
+    # Write-then-rename so readers never see a truncated file
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp, path)
+
+
+# ---------------------- Locked Collections ---------------------- #
+
+def load_locked_collections():
+    """Load set of collection IDs that are permanently full."""
+    if os.path.exists(LOCKED_FILE):
+        try:
+            with open(LOCKED_FILE, 'r') as f:
+                data = json.load(f)
+                return set(str(i) for i in data) if isinstance(data, list) else set()
+        except Exception:
+            pass
+    return set()
+
+
+def save_locked_collections(locked):
+    """Persist locked collection IDs."""
+    _write_json(LOCKED_FILE, sorted(locked), indent=2)
+
+
+def lock_collection(col_id):
+    """Mark a collection as permanently full."""
+    with file_lock():
+        locked = load_locked_collections()
+        if str(col_id) in locked:
+            return
+        locked.add(str(col_id))
+        save_locked_collections(locked)
+    print(f"  🔒 LOCKED collection {col_id} - will never add to it again")
+
+
+def is_collection_locked(col_id):
+    """Check if a collection is locked."""
+    return str(col_id) in load_locked_collections()
+
+
+# ---------------------- Provisioned Collections ---------------------- #
+
+def register_collection(tag, col_id):
+    """
+    Record a newly created collection in the config overlay file and append it
+    to config.COLLECTION_IDS[tag] so the running process can use it immediately.
+    """
+    col_id = str(col_id)
+    with file_lock():
+        overlay = config.load_collection_overlay()
+        ids = overlay.setdefault(tag, [])
+        if col_id not in ids:
+            ids.append(col_id)
+            _write_json(config.COLLECTION_OVERLAY_FILE, overlay, indent=2)
+    config.merge_collection_overlay(config.COLLECTION_IDS, {tag: [col_id]})
+
+
+# ---------------------- Cache Handling ---------------------- #
+
+def load_cache():
+    """Load cache: { tag: { collection_id: set(item_ids) } }"""
+    cache = {}
+    try:
+        for tag in os.listdir(CACHE_DIR):
+            tag_dir = os.path.join(CACHE_DIR, tag)
+            if not os.path.isdir(tag_dir):
+                continue
+            for fname in os.listdir(tag_dir):
+                if not fname.endswith('.json'):
+                    continue
+                cid = fname[:-5]
+                fpath = os.path.join(tag_dir, fname)
+                try:
+                    with open(fpath, 'r') as f:
+                        items = json.load(f)
+                    if isinstance(items, list):
+                        cache.setdefault(tag, {})[cid] = set(str(i) for i in items)
+                except Exception:
+                    pass
+    except Exception:
+        pass
+    return cache
+
+
+def save_cache(cache):
+    """Save cache to disk."""
+    for tag, collections in cache.items():
+        tag_dir = os.path.join(CACHE_DIR, tag)
+        os.makedirs(tag_dir, exist_ok=True)
+        for cid, items in collections.items():
+            fpath = os.path.join(tag_dir, f"{cid}.json")
+            with open(fpath, 'w') as f:
+                json.dump(sorted(items), f, indent=2)
+
+
+def get_all_cached_items_for_tag(cache, tag):
+    """Get union of all cached items across all collections for a tag."""
+    if tag not in cache:
+        return set()
+    result = set()
+    for items in cache[tag].values():
+        result.update(items)
+    return result
+
+
+# ---------------------- Failed Items ---------------------- #
+
+def load_failed_items():
+    """Load { tag: [item_ids] } of items that persistently failed to add."""
+    if os.path.exists(FAILED_FILE):
+        try:
+            with open(FAILED_FILE, 'r') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception:
+            pass
+    return {}
+
+
+def save_failed_items(tag, item_ids):
+    """Append items to the failed list for a tag (duplicates removed, order kept)."""
+    with file_lock():
+        failed_data = load_failed_items()
+        failed_data.setdefault(tag, []).extend(item_ids)
+        failed_data[tag] = list(dict.fromkeys(failed_data[tag]))
+        _write_json(FAILED_FILE, failed_data, indent=2)
+
+
+# ---------------------- Add Journal ---------------------- #
+#
+# Per-tag record of an add run in progress, rewritten after every item
+# (add_journal/<tag>.json):
+# {"target_col": str, "pending": [ids], "failed": [ids],
+#  "added": {col_id: [ids]}, "live_counts": {col_id: int}, "in_flight": {id: col_id},
+#  "cross_added": {other_tag: {col_id: [ids]}}}
+# A journal only exists while a tag's queue is being drained, so finding one at
+# startup means the previous run was interrupted.
+
+def _journal_path(tag):
+    return os.path.join(ADD_JOURNAL_DIR, f"{tag}.json")
+
+
+def _load_legacy_journals():
+    if os.path.exists(ADD_JOURNAL_FILE):
+        try:
+            with open(ADD_JOURNAL_FILE, 'r') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception:
+            pass
+    return {}
+
+
+def load_add_journal(tag):
+    """Return the interrupted add run for a tag, or None."""
+    path = _journal_path(tag)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else None
+        except Exception:
+            return None
+    return _load_legacy_journals().get(tag)
+
+
+def save_add_journal(tag, journal):
+    """Persist the current add run state for a tag."""
+    os.makedirs(ADD_JOURNAL_DIR, exist_ok=True)
+    # Write-then-rename so a crash mid-write never leaves a truncated journal
+    _write_json(_journal_path(tag), journal)
+
+
+def clear_add_journal(tag):
+    """Drop a tag's journal once its queue is done."""
+    path = _journal_path(tag)
+    if os.path.exists(path):
+        os.remove(path)
+    legacy = _load_legacy_journals()
+    if legacy.pop(tag, None) is not None:
+        if legacy:
+            with open(ADD_JOURNAL_FILE, 'w') as f:
+                json.dump(legacy, f)
+        else:
+            os.remove(ADD_JOURNAL_FILE)
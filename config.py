@@ -1,15 +1,42 @@
 import os
-from playwright.sync_api import sync_playwright
+import json
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Use a new profile directory to avoid conflicts with old Selenium profile
 AUTO_PROFILE_PATH = os.path.join(BASE_DIR, "playwright_profile")
 os.makedirs(AUTO_PROFILE_PATH, exist_ok=True)
 
+# How the main browser gets its Steam login:
+# - "profile":       persistent Chromium profile in playwright_profile/ (default)
+# - "storage_state": fresh, non-persistent context built from the cookies in STORAGE_STATE_PATH
+#                    (export them once with: python login_steam.py --export-state)
+SESSION_MODE = "profile"
+# Contains Steam login cookies - keep it private, never commit it
+STORAGE_STATE_PATH = os.path.join(BASE_DIR, "steam_session.json")
+
 # Directory to store per-tag cache files
 CACHE_DIR = os.path.join(BASE_DIR, "cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# SQLite store of item metadata (title, author, publish time, tags) seen while scraping
+ITEM_DB_PATH = os.path.join(BASE_DIR, "workshop_items.db")
+
+# On-disk cache for read-only pages (workshop browse pages, collection pages)
+HTTP_CACHE_DIR = os.path.join(BASE_DIR, "http_cache")
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Seconds a cached page is served without asking Steam (after that it is revalidated)
+HTTP_CACHE_TTL = 300
+# Locked collections never change through us, so their pages may be reused much longer
+HTTP_CACHE_LOCKED_TTL = 24 * 3600
+
+# Watch mode (--watch): page 1 of each tag is polled on its own interval, aiming for
+# about WATCH_TARGET_NEW_PER_POLL new items per poll given the tag's recent upload rate
+WATCH_MIN_INTERVAL = 120  # seconds
+WATCH_MAX_INTERVAL = 3600  # seconds
+WATCH_TARGET_NEW_PER_POLL = 1.0
+# Weight of the latest poll when updating a tag's upload rate estimate (0..1)
+WATCH_RATE_SMOOTHING = 0.3
+
 # Maximum number of items per collection (Steam limit is ~979, use 950 for safety)
 MAX_COLLECTION_ITEMS = 950
 
@@ -21,27 +48,225 @@ COLLECTION_IDS = {
     "Wheels": ["3530392942"],
 }
 
+# Themed sub-collections filled by title (see title_router.py), in addition to the tag
+# collections. names_file is a JSON list of names, or a dict holding it under names_key;
+# only items with one of `tags` are routed. Leave collection_ids empty to only preview
+# matches (python title_router.py).
+SUBCOLLECTIONS = {
+    "Crash Bandicoot": {
+        "names_file": "CrashBandicootCharacters.json",
+        "names_key": "characters",
+        "tags": ["Characters"],
+        "collection_ids": [],
+    },
+}
+
+# Collections created automatically by the bot ({ tag: [collection IDs] }); merged into COLLECTION_IDS below
+COLLECTION_OVERLAY_FILE = os.path.join(BASE_DIR, "collections_overlay.json")
+
+# Create a new collection for a tag when the free space left in its unlocked
+# collections (minus the items waiting to be added) drops below this many items
+AUTO_PROVISION = True
+PROVISION_THRESHOLD = 50
+
+# Title/description for provisioned collections ({game} - the current game's name in
+# APPS - {tag} and {number} are filled in)
+PROVISION_TITLE_TEMPLATE = "{game} - {tag} #{number}"
+PROVISION_DESCRIPTION = "All {game} workshop {tag}, kept up to date automatically."
+
+
+def load_collection_overlay(path=None):
+    """Load { tag: [collection IDs] } from the overlay file, or {} if missing/invalid."""
+    path = path or COLLECTION_OVERLAY_FILE
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return {tag: [str(i) for i in ids] for tag, ids in data.items() if isinstance(ids, list)}
+        except Exception:
+            pass
+    return {}
+
+
+def merge_collection_overlay(collection_ids, overlay):
+    """Append overlay collection IDs to collection_ids (in place), skipping duplicates."""
+    for tag, ids in overlay.items():
+        existing = collection_ids.setdefault(tag, [])
+        for col_id in ids:
+            if col_id not in existing:
+                existing.append(col_id)
+    return collection_ids
+
+
+merge_collection_overlay(COLLECTION_IDS, load_collection_overlay())
+
+# Steam app ID of the game whose workshop we track (The Karters 2)
+APP_ID = "2269950"
+
+# Where Steam downloads this game's subscribed workshop items (one folder per item ID).
+# subscribe_collection.py compares it with the cached collections and skips the browser
+# when nothing is missing. Adjust for your Steam library location.
+STEAM_WORKSHOP_CONTENT_DIR = os.path.join(
+    "C:\\", "Program Files (x86)", "Steam", "steamapps", "workshop", "content", APP_ID)
+
 # The Karters 2 Workshop base URL
-WORKSHOP_BASE_URL = "https://steamcommunity.com/workshop/browse/?appid=2269950&requiredtags[]="
+WORKSHOP_BASE_URL = f"https://steamcommunity.com/workshop/browse/?appid={APP_ID}&requiredtags[]="
+
+# Chromium flags used for every browser we launch
+BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-infobars",
+    "--no-first-run",
+    "--disable-restore-session-state",
+    "--ignore-certificate-errors",
+    "--allow-running-insecure-content",
+]
+
+# Injected into every page to hide automation flags
+HIDE_AUTOMATION_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+"""
+
+# Crash watchdog: after this many failed Steam requests in a row, probe the page
+# (navigate to about:blank within WATCHDOG_PROBE_TIMEOUT ms) and restart the browser if it is dead
+WATCHDOG_FAILURE_THRESHOLD = 2
+WATCHDOG_PROBE_TIMEOUT = 5000
+
+# Adaptive pacing of Steam requests (see pacing.py), shared by all request paths:
+# the rate grows by PACING_RATE_STEP req/s after each clean response and is multiplied
+# by PACING_BACKOFF on 429/5xx, errors, or latency above PACING_SLOW_FACTOR x the baseline
+PACING_INITIAL_RATE = 2.0  # requests per second
+PACING_MIN_RATE = 0.05     # never wait more than 20 s between requests
+PACING_MAX_RATE = 5.0
+PACING_RATE_STEP = 0.1
+PACING_BACKOFF = 0.5
+PACING_SLOW_FACTOR = 3.0
+# Weight of the latest response when updating the latency baseline (0..1)
+PACING_LATENCY_SMOOTHING = 0.2
+
+# Parallel adds (--workers N): global cap on adds in flight at once, whatever N is
+MAX_CONCURRENT_ADDS = 3
 
 # The base URL for shared files details
 SHARED_FILE_DETAILS_URL = "https://steamcommunity.com/sharedfiles/filedetails/?id="
 
+# Endpoint the collection editor posts a new child order to
+COLLECTION_SORT_URL = "https://steamcommunity.com/sharedfiles/setcollectionsortorder"
+
+# After adding, set each touched collection's order to newest-first in one request
+# (needed for parallel adds, which finish in any order within a collection; one-by-one adds
+# already go oldest first)
+REORDER_AFTER_ADD = True
 
-def configure_browser(headless=True, prompt_login=False):
+# Public Web API endpoint returning a collection's children as JSON (no key needed)
+COLLECTION_DETAILS_API_URL = "https://api.steampowered.com/ISteamRemoteStorage/GetCollectionDetails/v1/"
+
+# After adding, check this many random adds per collection plus the last VERIFY_RECENT
+# against Steam; the collection is only rescraped in full if one of them is missing
+VERIFY_SAMPLE_SIZE = 5
+VERIFY_RECENT = 3
+
+# Page with the "create collection" form
+CREATE_COLLECTION_URL = f"https://steamcommunity.com/sharedfiles/editcollection/?appid={APP_ID}"
+# The logged-in user's collections; checked before creating one so a creation that
+# went through but wasn't recorded doesn't create a duplicate
+MY_COLLECTIONS_URL = f"https://steamcommunity.com/my/myworkshopfiles/?section=collections&appid={APP_ID}&numperpage=30"
+
+# Games served by this bot: { app ID: {"name": str, "collection_ids": { tag: [collection IDs] }} }.
+# The first entry is the game configured above and keeps its files in BASE_DIR; every
+# other game keeps its cache, overlay, failed items and journal in apps/<app ID>/.
+# Switch with use_app(); see also the work queue (work_queue.py, --worker).
+APPS = {
+    APP_ID: {"name": "The Karters 2", "collection_ids": COLLECTION_IDS},
+}
+DEFAULT_APP_ID = APP_ID
+
+# Shared work queue of (app, tag) jobs for --worker processes (may sit on a shared drive)
+WORK_QUEUE_PATH = os.path.join(BASE_DIR, "work_queue.db")
+# A claimed job belongs to its worker for this long; heartbeats extend it, and a job
+# whose lease ran out (crashed worker) is handed to the next worker that asks
+WORK_LEASE_SECONDS = 600
+WORK_HEARTBEAT_INTERVAL = 60
+# A job that fails this many times is parked as "failed" instead of re-queued
+WORK_MAX_ATTEMPTS = 3
+# Workers on this machine take turns committing to the repository through this lock file
+GIT_LOCK_PATH = os.path.join(BASE_DIR, "git_commit.lock")
+# ...and updating the state files they share (locked collections, overlay, failed items)
+STATE_LOCK_PATH = os.path.join(BASE_DIR, "state.lock")
+
+
+def app_data_dir(app_id):
+    """Directory holding an app's local state files."""
+    return BASE_DIR if str(app_id) == DEFAULT_APP_ID else os.path.join(BASE_DIR, "apps", str(app_id))
+
+
+def use_app(app_id):
+    """
+    Make app_id the current game: switches APP_ID, the workshop/create URLs,
+    COLLECTION_IDS (with that app's overlay merged in), CACHE_DIR and
+    COLLECTION_OVERLAY_FILE. Returns the app's data directory.
+    """
+    global APP_ID, WORKSHOP_BASE_URL, CREATE_COLLECTION_URL, MY_COLLECTIONS_URL, STEAM_WORKSHOP_CONTENT_DIR
+    global COLLECTION_IDS, CACHE_DIR, COLLECTION_OVERLAY_FILE
+    app_id = str(app_id)
+    if app_id not in APPS:
+        raise ValueError(f"Unknown app {app_id}; add it to APPS in config.py")
+    data_dir = app_data_dir(app_id)
+    os.makedirs(data_dir, exist_ok=True)
+    APP_ID = app_id
+    WORKSHOP_BASE_URL = f"https://steamcommunity.com/workshop/browse/?appid={app_id}&requiredtags[]="
+    CREATE_COLLECTION_URL = f"https://steamcommunity.com/sharedfiles/editcollection/?appid={app_id}"
+    MY_COLLECTIONS_URL = f"https://steamcommunity.com/my/myworkshopfiles/?section=collections&appid={app_id}&numperpage=30"
+    STEAM_WORKSHOP_CONTENT_DIR = os.path.join(os.path.dirname(STEAM_WORKSHOP_CONTENT_DIR), app_id)
+    CACHE_DIR = os.path.join(data_dir, "cache")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    COLLECTION_OVERLAY_FILE = os.path.join(data_dir, "collections_overlay.json")
+    COLLECTION_IDS = APPS[app_id]["collection_ids"]
+    merge_collection_overlay(COLLECTION_IDS, load_collection_overlay())
+    return data_dir
+
+
+def configure_browser(headless=True, prompt_login=False, session_mode=None):
     """
     Configure and launch a Playwright browser instance with persistent context.
     
     Args:
         headless (bool): Run browser in headless mode (no UI). Default True.
         prompt_login (bool): If True and not logged in, show browser for manual login.
+        session_mode (str): Overrides SESSION_MODE (e.g. "storage_state" for workers,
+                            which can't share the profile directory).
     
     Returns:
         tuple: (playwright_instance, context, page, is_logged_in) - caller should call context.close() 
                and playwright.stop() when done
     """
+    # Imported here so modules that only need settings don't pay for (or require) Playwright
+    from playwright.sync_api import sync_playwright
+
     playwright = sync_playwright().start()
     
+    # Storage-state mode: no profile directory to load, lock or corrupt
+    # (a manual login still goes through the profile and re-exports the state)
+    if (session_mode or SESSION_MODE) == "storage_state" and os.path.exists(STORAGE_STATE_PATH) and not prompt_login:
+        browser = playwright.chromium.launch(headless=headless, args=BROWSER_ARGS)
+        context = browser.new_context(
+            storage_state=STORAGE_STATE_PATH,
+            viewport={"width": 1920, "height": 1080},
+            accept_downloads=True,
+        )
+        context.add_init_script(HIDE_AUTOMATION_SCRIPT)
+        page = context.new_page()
+        is_logged_in = check_login_status(page)
+        if not is_logged_in:
+            print("⚠️  Saved Steam session has expired. Log in again with: python login_steam.py --export-state")
+        return playwright, context, page, is_logged_in
+    
     # Launch browser with persistent context for session storage
     # Using Chromium (Edge/Chrome) for compatibility with Steam
     # Launch browser with persistent context for session storage
@@ -50,14 +275,7 @@ def configure_browser(headless=True, prompt_login=False):
         context = playwright.chromium.launch_persistent_context(
             user_data_dir=AUTO_PROFILE_PATH,
             headless=headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--disable-infobars",
-                "--no-first-run",
-                "--disable-restore-session-state",
-                "--ignore-certificate-errors",
-                "--allow-running-insecure-content",
-            ],
+            args=BROWSER_ARGS,
             viewport={"width": 1920, "height": 1080},
             accept_downloads=True,
         )
@@ -88,14 +306,7 @@ def configure_browser(headless=True, prompt_login=False):
     page = context.new_page()
     
     # Inject script to hide webdriver property
-    page.add_init_script("""
-        Object.defineProperty(navigator, 'webdriver', {
-            get: () => undefined
-        });
-        Object.defineProperty(navigator, 'plugins', {
-            get: () => [1, 2, 3, 4, 5]
-        });
-    """)
+    page.add_init_script(HIDE_AUTOMATION_SCRIPT)
     
     # Check if logged in
     is_logged_in = check_login_status(page)
@@ -150,9 +361,34 @@ def configure_browser(headless=True, prompt_login=False):
             print("   The browser may have been closed. Continuing anyway...")
             is_logged_in = False
     
+    if is_logged_in and SESSION_MODE == "storage_state":
+        export_storage_state(context)
+    
     return playwright, context, page, is_logged_in
 
 
+def export_storage_state(context, path=None):
+    """
+    Save the context's Steam cookies as a Playwright storage-state file.
+
+    Only Steam cookies are kept (no local storage or other sites), so the file
+    stays a few KB. Written atomically and readable only by the current user.
+    """
+    path = path or STORAGE_STATE_PATH
+    state = context.storage_state()
+    compact = {
+        "cookies": [c for c in state.get("cookies", []) if "steam" in c.get("domain", "")],
+        "origins": [],
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(compact, f, indent=2)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+    print(f"💾 Steam session exported to {os.path.basename(path)} ({len(compact['cookies'])} cookies)")
+    return path
+
+
 def check_login_status(page):
     """
     Check if user is logged into Steam by looking for user avatar or account menu.
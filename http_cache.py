@@ -0,0 +1,221 @@
+"""
+On-disk conditional-request cache for read-only Steam pages.
+
+Workshop browse pages and collection pages are re-downloaded on every run even
+though most of them (deep browse pages, locked collections) never change
+between runs. ResponseCache sits in front of page.goto via page.route:
+
+- a cached document younger than the TTL is served straight from disk
+- an older one is revalidated with If-None-Match / If-Modified-Since and
+  served from disk on 304 Not Modified
+- anything else is fetched normally and stored
+
+Only requests that actually go to Steam are paced (pacing.fetch); pages served
+straight from disk skip the pacer.
+
+Entries are keyed on URL plus the cookies that change what Steam renders
+(login, language, mature content), and evicted least-recently-used once the
+cache grows past its size limit.
+
+Only use it around read paths (serve() context manager); item pages visited
+by add_to_collection must stay live.
+"""
+
+import os
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+import config
+import pacing
+
+# Cookies that change the rendered page; others (e.g. tracking) don't split the cache
+KEY_COOKIES = ("steamLoginSecure", "Steam_Language", "wants_mature_content")
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of HTML documents with ETag/Last-Modified validators."""
+
+    def __init__(self, cache_dir=None, max_bytes=None, ttl=None):
+        self.cache_dir = cache_dir or config.HTTP_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.HTTP_CACHE_MAX_BYTES
+        self.ttl = ttl if ttl is not None else config.HTTP_CACHE_TTL
+        self.index_file = os.path.join(self.cache_dir, "index.json")
+        self.stats = {"fresh": 0, "revalidated": 0, "fetched": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    # ---------------------- Storage ---------------------- #
+
+    def _load_index(self):
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+            except Exception:
+                pass
+        return {}
+
+    def _save_index(self):
+        tmp = self.index_file + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_file)
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    @staticmethod
+    def make_key(url, cookies=None):
+        """Cache key for a URL as seen with the given { name: value } cookies."""
+        cookies = cookies or {}
+        parts = [url] + [f"{name}={cookies.get(name, '')}" for name in KEY_COOKIES]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, key):
+        """Return the index entry for a key, or None if missing or its body is gone."""
+        entry = self.index.get(key)
+        if entry and not os.path.exists(self._body_path(key)):
+            del self.index[key]
+            return None
+        return entry
+
+    def read_body(self, key):
+        with open(self._body_path(key), 'rb') as f:
+            return f.read()
+
+    def is_fresh(self, entry, ttl=None, now=None):
+        now = now if now is not None else time.time()
+        return now - entry["stored_at"] < (self.ttl if ttl is None else ttl)
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Validator headers for revalidating a cached entry."""
+        headers = {}
+        if entry.get("headers", {}).get("etag"):
+            headers["if-none-match"] = entry["headers"]["etag"]
+        if entry.get("headers", {}).get("last-modified"):
+            headers["if-modified-since"] = entry["headers"]["last-modified"]
+        return headers
+
+    def store(self, key, url, headers, body):
+        """Store a 200 response body and its validators, then evict down to max_bytes."""
+        if len(body) > self.max_bytes:
+            return
+        with open(self._body_path(key), 'wb') as f:
+            f.write(body)
+        now = time.time()
+        self.index[key] = {
+            "url": url,
+            "headers": {h: headers[h] for h in STORED_HEADERS if headers.get(h)},
+            "size": len(body),
+            "stored_at": now,
+            "last_used": now,
+        }
+        self._evict()
+        self._save_index()
+
+    def touch(self, key, revalidated=False):
+        """Mark an entry as used (and, after a 304, as freshly validated)."""
+        now = time.time()
+        self.index[key]["last_used"] = now
+        if revalidated:
+            self.index[key]["stored_at"] = now
+        self._save_index()
+
+    def invalidate(self, url):
+        """Drop every entry for a URL (including variants with extra query parameters)."""
+        stale = [k for k, e in self.index.items() if e["url"] == url or e["url"].startswith(url + "&")]
+        for key in stale:
+            self._remove(key)
+        self._save_index()
+
+    def _remove(self, key):
+        self.index.pop(key, None)
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(e["size"] for e in self.index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            total -= self.index[key]["size"]
+            self._remove(key)
+            if total <= self.max_bytes:
+                break
+
+    # ---------------------- Playwright Glue ---------------------- #
+
+    def handle_route(self, route, context, ttl=None):
+        """page.route handler: answer document GETs from the cache where possible."""
+        request = route.request
+        if request.method != "GET" or request.resource_type != "document":
+            route.continue_()
+            return
+
+        cookies = {c["name"]: c["value"] for c in context.cookies(request.url)}
+        key = self.make_key(request.url, cookies)
+        entry = self.lookup(key)
+
+        if entry and self.is_fresh(entry, ttl=ttl):
+            self.touch(key)
+            self.stats["fresh"] += 1
+            route.fulfill(status=200, headers=entry["headers"], body=self.read_body(key))
+            return
+
+        headers = dict(request.headers)
+        if entry:
+            headers.update(self.conditional_headers(entry))
+        try:
+            response, status = pacing.fetch(route, headers=headers)
+        except Exception:
+            # Fail the navigation now instead of leaving page.goto hanging until its timeout
+            route.abort()
+            return
+
+        if response.status == 304 and entry:
+            self.touch(key, revalidated=True)
+            self.stats["revalidated"] += 1
+            route.fulfill(status=200, headers=entry["headers"], body=self.read_body(key))
+            return
+
+        body = response.body()
+        self.stats["fetched"] += 1
+        # status is 429 for Steam's "too many requests" page, which comes back as a 200
+        if status == 200:
+            self.store(key, request.url, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+    @contextmanager
+    def serve(self, page, patterns=None, ttl=None):
+        """
+        Serve matching document requests on `page` from the cache while inside the block.
+
+        Args:
+            patterns: URL globs to cache (default: workshop browse and filedetails pages).
+            ttl: Freshness override in seconds for this block (e.g. longer for locked collections).
+        """
+        patterns = patterns or ("**/workshop/browse/**", "**/sharedfiles/filedetails/**")
+        context = page.context
+
+        def handler(route):
+            self.handle_route(route, context, ttl=ttl)
+
+        for pattern in patterns:
+            page.route(pattern, handler)
+        try:
+            with pacing.paced_by_route():
+                yield self
+        finally:
+            for pattern in patterns:
+                try:
+                    page.unroute(pattern, handler)
+                except Exception:
+                    pass  # Page may already be closed
@@ -0,0 +1,88 @@
+"""
+Per-run registry of workshop items shared by all tag loops.
+
+Items with several tags (say Characters and Vehicles) show up in more than one
+tag's crawl. Without a shared view each tag would load the item's page again,
+re-check items another tag already found deleted, and add the item in a
+separate visit per collection. The registry remembers, for the duration of a
+run, what the first lookup learned about each item:
+
+- its status (ok / unavailable / not an item)
+- its tags, from the detail page
+- which collections it was added to, including other tags' collections that
+  were ticked in the same "Add to Collection" dialog
+
+Thread-safe, so pool workers can record into it too.
+"""
+
+import threading
+import item_store
+
+
+class ItemRegistry:
+    """What this run already knows about each item, keyed by item ID."""
+
+    def __init__(self, cache, target_for_tag=None):
+        """
+        Args:
+            cache: The run's { tag: { col_id: set(item_ids) } } cache, used to
+                   tell whether an item is already in another tag's collections.
+            target_for_tag: Callable tag -> collection ID (or None) used to pick
+                            the collection for cross-tag adds. Without it, items
+                            are only added to the current tag's collection.
+        """
+        self.cache = cache
+        self.target_for_tag = target_for_tag
+        self.status = {}
+        self.tags = {}
+        self.cross_adds = []  # (item_id, tag, col_id) not yet booked by the caller
+        self.lock = threading.Lock()
+
+    def record(self, item_id, status=None, tags=None):
+        """Remember an item's status and/or tags from a page we just loaded."""
+        with self.lock:
+            if status:
+                self.status[item_id] = status
+            if tags:
+                self.tags.setdefault(item_id, set()).update(tags)
+
+    def is_dead(self, item_id):
+        """True if a lookup this run found the item deleted or not an item."""
+        return self.status.get(item_id) in (item_store.STATUS_UNAVAILABLE, item_store.STATUS_NOT_ITEM)
+
+    def filter_new(self, item_ids):
+        """Drop items another tag already found dead this run."""
+        return [i for i in item_ids if not self.is_dead(i)]
+
+    def _in_tag(self, tag, item_id):
+        return any(item_id in items for items in self.cache.get(tag, {}).values())
+
+    def extra_targets(self, item_id, tags, current_tag):
+        """
+        Collections of other configured tags the item also belongs in.
+
+        Returns { col_id: tag } for each of the item's tags (other than
+        current_tag) whose collections don't have it yet.
+        """
+        if not self.target_for_tag:
+            return {}
+        targets = {}
+        with self.lock:
+            for tag in set(tags or ()) - {current_tag}:
+                if self._in_tag(tag, item_id):
+                    continue
+                col_id = self.target_for_tag(tag)
+                if col_id:
+                    targets[col_id] = tag
+        return targets
+
+    def record_cross_add(self, item_id, tag, col_id):
+        """Record an add to another tag's collection made during this tag's visit."""
+        with self.lock:
+            self.cross_adds.append((item_id, tag, col_id))
+
+    def pop_cross_adds(self):
+        """Return and clear the cross-tag adds recorded since the last call, for the caller to book."""
+        with self.lock:
+            adds, self.cross_adds = self.cross_adds, []
+        return adds
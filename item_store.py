@@ -0,0 +1,259 @@
+"""
+Local workshop item metadata store.
+
+Everything the scrapers already see about an item (title, author, publish
+time, tags, status) is recorded in a small SQLite database, so questions like
+"what's new since X" or "who uploaded this" can be answered without loading
+Steam pages again.
+
+Tables:
+- items:     one row per workshop item (metadata + first/last seen timestamps)
+- item_tags: (item_id, tag) pairs, indexed by tag
+"""
+
+import os
+import re
+import time
+import sqlite3
+import config
+
+DB_PATH = config.ITEM_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id        TEXT PRIMARY KEY,
+    app_id         TEXT,
+    title          TEXT,
+    author         TEXT,
+    time_published INTEGER,
+    time_updated   INTEGER,
+    status         TEXT,
+    first_seen     INTEGER NOT NULL,
+    last_seen      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_tags (
+    item_id TEXT NOT NULL,
+    tag     TEXT NOT NULL,
+    PRIMARY KEY (item_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_items_published ON items(time_published);
+CREATE INDEX IF NOT EXISTS idx_items_author ON items(author);
+CREATE INDEX IF NOT EXISTS idx_items_first_seen ON items(first_seen);
+CREATE INDEX IF NOT EXISTS idx_item_tags_tag ON item_tags(tag);
+"""
+
+# Item statuses recorded by the scrapers
+STATUS_OK = "ok"
+STATUS_UNAVAILABLE = "unavailable"  # deleted/hidden on Steam
+STATUS_NOT_ITEM = "not_item"        # ID points at a collection, not an item
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+
+def connect(path=None):
+    """Open (and create if needed) the item store. Returns a sqlite3 connection."""
+    path = path or DB_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Generous busy timeout: several worker processes may write at once
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_items(conn, items, tag=None, app_id=None):
+    """
+    Upsert item metadata.
+
+    Args:
+        items: iterable of dicts with "item_id" and any of "title", "author",
+               "time_published", "time_updated", "status", "tags".
+        tag: tag the items were found under (added to each item's tag set).
+        app_id: Steam app ID; defaults to config.APP_ID.
+
+    Known values are never overwritten with None, so a browse page (no publish
+    time) can't erase what a detail page recorded earlier.
+    """
+    now = int(time.time())
+    app_id = app_id or config.APP_ID
+    with conn:
+        for item in items:
+            item_id = str(item["item_id"])
+            conn.execute(
+                """
+                INSERT INTO items (item_id, app_id, title, author, time_published,
+                                   time_updated, status, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(item_id) DO UPDATE SET
+                    title = COALESCE(excluded.title, items.title),
+                    author = COALESCE(excluded.author, items.author),
+                    time_published = COALESCE(excluded.time_published, items.time_published),
+                    time_updated = COALESCE(excluded.time_updated, items.time_updated),
+                    status = COALESCE(excluded.status, items.status),
+                    last_seen = excluded.last_seen
+                """,
+                (item_id, app_id, item.get("title"), item.get("author"),
+                 item.get("time_published"), item.get("time_updated"),
+                 item.get("status"), now, now),
+            )
+            tags = set(item.get("tags") or ())
+            if tag:
+                tags.add(tag)
+            conn.executemany(
+                "INSERT OR IGNORE INTO item_tags (item_id, tag) VALUES (?, ?)",
+                [(item_id, t) for t in tags],
+            )
+
+
+def record_status(conn, item_id, status):
+    """Record the availability status of a single item."""
+    record_items(conn, [{"item_id": item_id, "status": status}])
+
+
+def _row_to_dict(conn, row):
+    item = dict(row)
+    item["tags"] = sorted(r["tag"] for r in conn.execute(
+        "SELECT tag FROM item_tags WHERE item_id = ?", (item["item_id"],)))
+    return item
+
+
+def get_item(conn, item_id):
+    """Return the stored metadata for one item as a dict, or None."""
+    row = conn.execute("SELECT * FROM items WHERE item_id = ?", (str(item_id),)).fetchone()
+    return _row_to_dict(conn, row) if row else None
+
+
+def get_items(conn, item_ids):
+    """Return { item_id: metadata dict } for the given IDs that are in the store."""
+    ids = [str(i) for i in item_ids]
+    result = {}
+    # Stay well below SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT * FROM items WHERE item_id IN ({marks})", chunk):
+            result[row["item_id"]] = dict(row, tags=[])
+        for row in conn.execute(f"SELECT item_id, tag FROM item_tags WHERE item_id IN ({marks})", chunk):
+            if row["item_id"] in result:
+                result[row["item_id"]]["tags"].append(row["tag"])
+    return result
+
+
+def items_with_tag(conn, tag, app_id=None):
+    """Return the set of item IDs of a game (default config.APP_ID) recorded under a tag."""
+    rows = conn.execute(
+        """SELECT t.item_id FROM item_tags t JOIN items i ON i.item_id = t.item_id
+           WHERE t.tag = ? AND i.app_id = ?""",
+        (tag, app_id or config.APP_ID))
+    return {r["item_id"] for r in rows}
+
+
+def items_by_author(conn, author):
+    """Return item IDs uploaded by an author, newest first."""
+    rows = conn.execute(
+        "SELECT item_id FROM items WHERE author = ? ORDER BY time_published DESC", (author,))
+    return [r["item_id"] for r in rows]
+
+
+def items_since(conn, since, tag=None, field="first_seen", app_id=None):
+    """
+    Return item IDs newer than a timestamp, newest first.
+
+    Args:
+        since: Unix timestamp.
+        tag: Optional tag filter (tags are per game, so this also filters by app_id).
+        field: "first_seen" (when we first saw it) or "time_published" (Steam's date).
+        app_id: Game the tag belongs to; defaults to config.APP_ID.
+    """
+    if field not in ("first_seen", "time_published"):
+        raise ValueError(f"Unsupported field: {field}")
+    if tag:
+        rows = conn.execute(
+            f"""SELECT i.item_id FROM items i JOIN item_tags t ON t.item_id = i.item_id
+                WHERE t.tag = ? AND i.app_id = ? AND i.{field} > ? ORDER BY i.{field} DESC""",
+            (tag, app_id or config.APP_ID, since))
+    else:
+        rows = conn.execute(
+            f"SELECT item_id FROM items WHERE {field} > ? ORDER BY {field} DESC", (since,))
+    return [r["item_id"] for r in rows]
+
+
+def upload_rate(conn, tag, window_hours=168, now=None, app_id=None):
+    """Average uploads per hour for a game's (default config.APP_ID) tag over the last `window_hours`, by publish time."""
+    now = now if now is not None else time.time()
+    row = conn.execute(
+        """SELECT COUNT(*) AS n FROM items i JOIN item_tags t ON t.item_id = i.item_id
+           WHERE t.tag = ? AND i.app_id = ? AND i.time_published > ?""",
+        (tag, app_id or config.APP_ID, int(now - window_hours * 3600))).fetchone()
+    return row["n"] / window_hours
+
+
+def sort_newest_first(conn, item_ids):
+    """
+    Order item IDs newest first by publish time. Items without a recorded
+    publish time (seen before detail pages were recorded) go last, ordered by
+    ID, which Steam assigns in creation order.
+    """
+    meta = get_items(conn, item_ids)
+
+    def key(item_id):
+        published = (meta.get(str(item_id)) or {}).get("time_published") or 0
+        return (published, int(item_id) if str(item_id).isdigit() else 0)
+
+    return sorted((str(i) for i in item_ids), key=key, reverse=True)
+
+
+def items_with_status(conn, status):
+    """Return the set of item IDs with a given status."""
+    return {r["item_id"] for r in conn.execute("SELECT item_id FROM items WHERE status = ?", (status,))}
+
+
+def titles(conn, app_id=None):
+    """
+    Return { item_id: (title, set(tags)) } for every titled item of a game
+    (default config.APP_ID) not known to be dead, in one pass.
+    """
+    result = {}
+    app_id = app_id or config.APP_ID
+    rows = conn.execute(
+        """SELECT item_id, title FROM items
+           WHERE title IS NOT NULL AND app_id = ? AND COALESCE(status, '') NOT IN (?, ?)""",
+        (app_id, STATUS_UNAVAILABLE, STATUS_NOT_ITEM))
+    for row in rows:
+        result[row["item_id"]] = (row["title"], set())
+    for row in conn.execute(
+            "SELECT t.item_id, t.tag FROM item_tags t JOIN items i ON i.item_id = t.item_id WHERE i.app_id = ?",
+            (app_id,)):
+        if row["item_id"] in result:
+            result[row["item_id"]][1].add(row["tag"])
+    return result
+
+
+def parse_steam_date(text, now=None):
+    """
+    Parse a workshop date like "14 Jan, 2024 @ 3:45pm" or "Jan 14 @ 3:45pm"
+    (year omitted for the current year) into a Unix timestamp. Returns None
+    if the text doesn't look like a Steam date.
+    """
+    if not text:
+        return None
+    text = text.strip().lower()
+    m = re.match(r"(\d{1,2}) ([a-z]{3})[a-z]*,? ?(\d{4})? @ (\d{1,2}):(\d{2}) ?([ap]m)", text)
+    if m:
+        day, mon, year, hour, minute, ampm = m.groups()
+    else:
+        m = re.match(r"([a-z]{3})[a-z]* (\d{1,2}),? ?(\d{4})? @ (\d{1,2}):(\d{2}) ?([ap]m)", text)
+        if not m:
+            return None
+        mon, day, year, hour, minute, ampm = m.groups()
+    if mon not in _MONTHS:
+        return None
+    hour = int(hour) % 12 + (12 if ampm == "pm" else 0)
+    if not year:
+        year = time.localtime(now if now is not None else time.time()).tm_year
+    try:
+        return int(time.mktime((int(year), _MONTHS[mon], int(day), hour, int(minute), 0, 0, 0, -1)))
+    except (OverflowError, ValueError):
+        return None
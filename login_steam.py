@@ -1,11 +1,16 @@
 """
 Standalone Steam login script.
 Run this once to establish a logged-in session, then use auto_update_all.py normally.
+
+With --export-state the Steam cookies are also saved to a small storage-state
+file (config.STORAGE_STATE_PATH) for SESSION_MODE = "storage_state".
 """
 
 import os
 import sys
+import argparse
 from playwright.sync_api import sync_playwright
+import config
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROFILE_PATH = os.path.join(BASE_DIR, "playwright_profile")
@@ -13,6 +18,12 @@ os.makedirs(PROFILE_PATH, exist_ok=True)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Log into Steam once and save the session")
+    parser.add_argument("--export-state", action="store_true",
+                        help="Also save the Steam cookies to a storage-state file (SESSION_MODE = \"storage_state\")")
+    args = parser.parse_args()
+    export_state = args.export_state or config.SESSION_MODE == "storage_state"
+    
     print("=" * 50)
     print("Steam Login - Manual Login Helper")
     print("=" * 50)
@@ -56,6 +67,8 @@ def main():
         if logout_btn or user_avatar:
             print("\n✅ Login successful! Session saved.")
             print("You can now run: python auto_update_all.py")
+            if export_state:
+                config.export_storage_state(context)
         else:
             print("\n⚠️  Could not verify login. You may need to try again.")
         
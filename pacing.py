@@ -0,0 +1,159 @@
+"""
+Adaptive pacing for Steam requests (AIMD).
+
+Every request path (browse pages, collection pages, item pages, API calls)
+waits for its turn on one shared Pacer and reports how the request went:
+
+- clean, fast response: the request rate grows by PACING_RATE_STEP
+- 429, 5xx, Steam's "too many requests" error page, timeout/network error,
+  or latency far above the running baseline: the rate is cut by PACING_BACKOFF
+
+so the bot runs as fast as Steam currently allows instead of always paying
+the worst-case delay. Thread-safe: session pool workers share the same
+budget, so N workers don't multiply the load on Steam.
+
+Pages served from the local page cache (http_cache.serve) never reach Steam,
+so they neither wait for a slot nor count as responses: inside serve() the
+route handler paces only the requests it really sends (fetch()).
+"""
+
+import re
+import time
+import threading
+from contextlib import contextmanager
+import config
+
+# Statuses that mean Steam is throttling us or struggling
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Pacer:
+    """Shared request-rate controller: additive increase, multiplicative decrease."""
+
+    def __init__(self, initial_rate=None, min_rate=None, max_rate=None):
+        self.rate = initial_rate or config.PACING_INITIAL_RATE  # requests per second
+        self.min_rate = min_rate or config.PACING_MIN_RATE
+        self.max_rate = max_rate or config.PACING_MAX_RATE
+        self.baseline_latency = None
+        self.next_slot = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until this caller's turn to send a request."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_slot)
+            self.next_slot = start + 1 / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+    def record(self, latency, status=None, failed=False):
+        """
+        Feed back the outcome of a request.
+
+        Args:
+            latency: Seconds the request took.
+            status: HTTP status of the response, if there was one.
+            failed: True for timeouts and network errors.
+        """
+        with self.lock:
+            self.requests += 1
+            # Floor the baseline: pages served from the local page cache return almost
+            # instantly and would otherwise make every real fetch look slow
+            slow = (self.baseline_latency is not None
+                    and latency > config.PACING_SLOW_FACTOR * max(self.baseline_latency, 0.5))
+            if failed or status in THROTTLE_STATUSES or slow:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * config.PACING_BACKOFF)
+                # Hold everyone back from now, not from the already-booked slot
+                self.next_slot = max(self.next_slot, time.monotonic() + 1 / self.rate)
+            else:
+                self.rate = min(self.max_rate, self.rate + config.PACING_RATE_STEP)
+            if not failed:
+                alpha = config.PACING_LATENCY_SMOOTHING
+                self.baseline_latency = (latency if self.baseline_latency is None
+                                         else alpha * latency + (1 - alpha) * self.baseline_latency)
+
+    def summary(self):
+        """One-line report of the current rate and counters."""
+        return (f"{self.rate:.2f} req/s now ({1 / self.rate:.2f}s between requests), "
+                f"{self.requests} requests, {self.throttled} slowed down")
+
+
+# The one pacer shared by every request path in this process
+pacer = Pacer()
+
+# Per thread: whether a page.route handler is pacing this thread's navigations
+_local = threading.local()
+
+_TITLE = re.compile(r"<title>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+def is_throttle_page(page):
+    """True if Steam answered 200 with its "too many requests" error page."""
+    try:
+        # Deleted items also get an error page, so the title alone isn't enough
+        if "error" not in page.title().lower():
+            return False
+        return page.query_selector("text=/too many requests/i") is not None
+    except Exception:
+        return False
+
+
+def is_throttle_html(html):
+    """is_throttle_page for a raw HTML document."""
+    m = _TITLE.search(html or "")
+    return bool(m and "error" in m.group(1).lower() and "too many requests" in html.lower())
+
+
+@contextmanager
+def paced_by_route():
+    """Inside this block, goto() leaves pacing to the page's route handler (see fetch())."""
+    previous = getattr(_local, "route_paced", False)
+    _local.route_paced = True
+    try:
+        yield
+    finally:
+        _local.route_paced = previous
+
+
+def fetch(route, **kwargs):
+    """
+    route.fetch paced by the shared pacer, for page.route handlers.
+    Returns (response, status), where status is 429 for Steam's "too many requests" page.
+    """
+    pacer.wait()
+    start = time.monotonic()
+    try:
+        response = route.fetch(**kwargs)
+    except Exception:
+        pacer.record(time.monotonic() - start, failed=True)
+        raise
+    latency = time.monotonic() - start
+    status = response.status
+    if status == 200 and is_throttle_html(response.text()):
+        status = 429
+    pacer.record(latency, status=status)
+    return response, status
+
+
+def goto(page, url, **kwargs):
+    """page.goto paced by the shared pacer. Returns the response; re-raises timeouts after recording them."""
+    if getattr(_local, "route_paced", False):
+        # Route handler paces what really goes to Steam; cache hits are free
+        return page.goto(url, **kwargs)
+    pacer.wait()
+    start = time.monotonic()
+    try:
+        response = page.goto(url, **kwargs)
+    except Exception:
+        pacer.record(time.monotonic() - start, failed=True)
+        raise
+    latency = time.monotonic() - start
+    status = response.status if response else None
+    if status == 200 and is_throttle_page(page):
+        status = 429
+    pacer.record(latency, status=status)
+    return response
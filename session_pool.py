@@ -0,0 +1,143 @@
+"""
+Pool of authenticated browser sessions for parallel adds.
+
+Each worker thread runs its own Playwright instance (the sync API is bound to
+the thread that started it) with a fresh browser context created from the
+main session's storage state, so every worker is logged in as the same Steam
+user without sharing the persistent profile directory.
+
+Workers drain a shared job queue of (item_id, col_id) and report
+(item_id, col_id, success) on a result queue; all cache/journal book-keeping
+stays in the caller's thread. A worker whose page dies or stops responding
+gets a new context (and browser if needed) before its next job, and a global
+semaphore caps how many adds are in flight at once.
+"""
+
+import queue
+import threading
+import config
+
+
+class SessionPool:
+    """N logged-in browser sessions adding items to collections in parallel."""
+
+    def __init__(self, storage_state, size, headless=True, max_concurrency=None, registry=None, debug=False):
+        """
+        Args:
+            storage_state: Playwright storage state (dict or file path) with the Steam login.
+            size: Number of worker sessions.
+            headless: Run worker browsers headless.
+            max_concurrency: Global cap on simultaneous adds (default: config.MAX_CONCURRENT_ADDS).
+            registry: Optional ItemRegistry to record item statuses and tags into.
+            debug: Passed through to add_to_collection.
+        """
+        self.storage_state = storage_state
+        self.size = size
+        self.headless = headless
+        self.debug = debug
+        self.registry = registry
+        self.slots = threading.BoundedSemaphore(min(size, max_concurrency or config.MAX_CONCURRENT_ADDS))
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f"session-{i}", daemon=True)
+            for i in range(size)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, item_id, col_id):
+        """Queue an item to be added to a collection."""
+        self.jobs.put((item_id, col_id))
+
+    def get_result(self):
+        """
+        Block until a job finishes. Returns (item_id, col_id, success).
+        If every worker has stopped (e.g. none could start a browser), queued
+        jobs are returned as failures instead of blocking forever.
+        """
+        while True:
+            try:
+                return self.results.get(timeout=1)
+            except queue.Empty:
+                if any(thread.is_alive() for thread in self.threads):
+                    continue
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                raise RuntimeError("All pool sessions have stopped")
+            if job is not None:
+                return job[0], job[1], False
+
+    def close(self):
+        """Stop all workers and close their browsers."""
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join(timeout=30)
+
+    # ---------------------- Worker Side ---------------------- #
+
+    def _open_session(self, playwright, browser):
+        """Return (browser, context, page), relaunching the browser if it is gone."""
+        if browser is None or not browser.is_connected():
+            browser = playwright.chromium.launch(headless=self.headless, args=config.BROWSER_ARGS)
+        context = browser.new_context(
+            storage_state=self.storage_state,
+            viewport={"width": 1920, "height": 1080},
+        )
+        context.add_init_script(config.HIDE_AUTOMATION_SCRIPT)
+        return browser, context, context.new_page()
+
+    def _worker(self, worker_id):
+        playwright = store = browser = context = page = None
+        healthy = False
+        try:
+            try:
+                # Imported here: each thread needs its own Playwright instance
+                from playwright.sync_api import sync_playwright
+                import item_store
+                from steam_collection_bot import add_to_collection
+                from browser_session import page_is_alive
+
+                playwright = sync_playwright().start()
+                store = item_store.connect()  # sqlite connections can't be shared across threads
+            except Exception as e:
+                # Leave the jobs to the other workers (get_result fails them if none are left)
+                print(f"    [session {worker_id}] failed to start: {str(e)[:60]}")
+                return
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                item_id, col_id = job
+                success = False
+                try:
+                    # Only probe after a failure; a page that just succeeded is alive
+                    if page is None or (not healthy and not page_is_alive(page)):
+                        if context is not None:
+                            print(f"    [session {worker_id}] page unresponsive, replacing it")
+                            try:
+                                context.close()
+                            except Exception:
+                                pass
+                        browser, context, page = self._open_session(playwright, browser)
+                    with self.slots:
+                        # Requests are paced by the pacer shared with the other workers
+                        success = add_to_collection(page, item_id, col_id, debug=self.debug, store=store,
+                                                    registry=self.registry)
+                except Exception as e:
+                    print(f"    [session {worker_id}] error: {str(e)[:60]}")
+                healthy = success
+                self.results.put((item_id, col_id, success))
+        finally:
+            for closable in (context, browser):
+                try:
+                    if closable is not None:
+                        closable.close()
+                except Exception:
+                    pass
+            if playwright is not None:
+                playwright.stop()
+            if store is not None:
+                store.close()
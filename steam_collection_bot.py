@@ -6,110 +6,251 @@ Key principles:
 2. Cache only grows - never overwrite with smaller data
 3. add_to_collection returns True/False so we know if it actually worked
 4. Fill collections in order: first one until full, then next, etc.
+5. Items are added oldest first; parallel adds run in any order and rely on set_collection_order afterwards
 """
 
 import os
 import sys
 import time
 import json
+from urllib.parse import urlparse, parse_qs, urlencode
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 import config
+import item_store
+import pacing
+from browser_session import page_is_alive
+from collection_state import (  # re-exported for existing callers
+    CACHE_DIR,
+    LOCKED_FILE,
+    load_locked_collections,
+    save_locked_collections,
+    lock_collection,
+    is_collection_locked,
+    register_collection,
+    load_cache,
+    save_cache,
+    get_all_cached_items_for_tag,
+)
+
+
+# ---------------------- Collection Provisioning ---------------------- #
+
+# Collection tiles (link and title) on the user's own collections page
+OWN_COLLECTIONS_JS = """
+() => Array.from(document.querySelectorAll('.workshopItem')).map(tile => {
+    const link = tile.querySelector('a[href*="id="]');
+    const title = tile.querySelector('.workshopItemTitle');
+    return {
+        href: link ? link.getAttribute('href') : null,
+        title: title ? title.textContent.trim() : null,
+    };
+})
+"""
 
-CACHE_DIR = config.CACHE_DIR
-LOCKED_FILE = os.path.join(config.BASE_DIR, "locked_collections.json")
 
+def list_own_collections(page, list_url=None):
+    """
+    List the logged-in user's collections for the current game.
 
-# ---------------------- Locked Collections ---------------------- #
+    Args:
+        list_url: Page listing them (defaults to config.MY_COLLECTIONS_URL;
+                  override to use a local stand-in).
 
-def load_locked_collections():
-    """Load set of collection IDs that are permanently full."""
-    if os.path.exists(LOCKED_FILE):
-        try:
-            with open(LOCKED_FILE, 'r') as f:
-                data = json.load(f)
-                return set(str(i) for i in data) if isinstance(data, list) else set()
-        except Exception:
-            pass
-    return set()
+    Returns { title: collection ID }, or None if the page couldn't be read.
+    """
+    url = list_url or config.MY_COLLECTIONS_URL
+    try:
+        response = pacing.goto(page, url, timeout=60000, wait_until="domcontentloaded")
+        if response is not None and not response.ok:
+            raise Exception(f"HTTP {response.status}")
+        tiles = page.evaluate(OWN_COLLECTIONS_JS)
+    except Exception as e:
+        print(f"  Can't list own collections: {str(e)[:60]}")
+        return None
+    collections = {}
+    for tile in tiles:
+        col_id = parse_qs(urlparse(tile["href"] or "").query).get("id", [None])[0]
+        if tile["title"] and col_id and col_id.isdigit():
+            collections.setdefault(tile["title"], col_id)
+    return collections
+
+
+def create_collection(page, title, description="", create_url=None):
+    """
+    Create a new (public) workshop collection with the logged-in session.
+
+    Args:
+        title: Collection title.
+        description: Collection description.
+        create_url: Page with the create-collection form (defaults to
+                    config.CREATE_COLLECTION_URL; override to use a local stand-in).
 
+    Returns the new collection ID, or None on failure.
+    """
+    url = create_url or config.CREATE_COLLECTION_URL
+    try:
+        pacing.goto(page, url, timeout=60000, wait_until="domcontentloaded")
+        page.wait_for_selector("input[name='title']", timeout=20000)
+        page.fill("input[name='title']", title)
+        desc = page.query_selector("textarea[name='description']")
+        if desc:
+            desc.fill(description)
+        # Public visibility and workshop agreement, when the form has them
+        public = page.query_selector("input[name='visibility'][value='0']")
+        if public:
+            public.check()
+        agree = page.query_selector("input#agree_terms, input[name='agree_terms']")
+        if agree and not agree.is_checked():
+            agree.check()
+
+        submit = page.query_selector(
+            "#SubmitItemForm, button[type='submit'], input[type='submit'], "
+            ".btn_green_white_innerfade:has-text('Save and Continue')")
+        if not submit:
+            raise Exception("Save button not found")
+        submit.click()
+        # Steam redirects to the manage page of the new collection (?id=...)
+        page.wait_for_url("**id=*", timeout=30000)
+        col_id = parse_qs(urlparse(page.url).query).get("id", [None])[0]
+        if not col_id or not col_id.isdigit():
+            raise Exception(f"No collection ID in {page.url}")
+
+        # New collections start unpublished; publish if the manage page offers it
+        publish = page.query_selector("#PublishCollectionBtn, .publish_btn, a:has-text('Publish')")
+        if publish:
+            publish.click()
+            time.sleep(1)
+        return col_id
+    except Exception as e:
+        error_msg = str(e)
+        if len(error_msg) > 60:
+            error_msg = error_msg[:57] + "..."
+        print(f"  Failed to create collection: {error_msg}")
+        return None
 
-def save_locked_collections(locked):
-    """Persist locked collection IDs."""
-    with open(LOCKED_FILE, 'w') as f:
-        json.dump(sorted(locked), f, indent=2)
 
+def provision_collection(page, tag, create_url=None, list_url=None):
+    """
+    Create the next collection for a tag and register it in the config overlay.
 
-def lock_collection(col_id):
-    """Mark a collection as permanently full."""
-    locked = load_locked_collections()
-    if str(col_id) not in locked:
-        locked.add(str(col_id))
-        save_locked_collections(locked)
-        print(f"  🔒 LOCKED collection {col_id} - will never add to it again")
+    A collection with the same title among the user's own collections (a
+    creation that went through but whose ID was never read back) is registered
+    instead of creating a duplicate. Nothing is created if that list can't be read.
+    Returns the collection ID, or None on failure.
+    """
+    number = len(config.COLLECTION_IDS.get(tag, [])) + 1
+    game = config.APPS[config.APP_ID]["name"]
+    title = config.PROVISION_TITLE_TEMPLATE.format(game=game, tag=tag, number=number)
+    existing = list_own_collections(page, list_url=list_url)
+    if existing is None:
+        print(f"  ⚠️ Can't check for an existing '{title}', not creating one")
+        return None
+    col_id = existing.get(title)
+    if col_id:
+        print(f"  ➕ Found existing collection {col_id} '{title}'")
+    else:
+        print(f"  ➕ Creating collection '{title}'...")
+        col_id = create_collection(page, title, config.PROVISION_DESCRIPTION.format(game=game, tag=tag), create_url=create_url)
+        if not col_id:
+            # The form may have gone through even though the new ID couldn't be read
+            col_id = (list_own_collections(page, list_url=list_url) or {}).get(title)
+    if col_id:
+        register_collection(tag, col_id)
+        print(f"  ➕ Created collection {col_id} for {tag}")
+    return col_id
 
 
-def is_collection_locked(col_id):
-    """Check if a collection is locked."""
-    return str(col_id) in load_locked_collections()
+# ---------------------- Steam Scraping ---------------------- #
 
+# Collect item links plus tile metadata from a workshop browse page in one round trip
+BROWSE_TILES_JS = """
+() => Array.from(document.querySelectorAll('a.item_link')).map(a => {
+    const tile = a.closest('.workshopItem');
+    const title = tile && tile.querySelector('.workshopItemTitle');
+    const author = tile && tile.querySelector('.workshopItemAuthorName a, .workshopItemAuthorName');
+    return {
+        href: a.getAttribute('href'),
+        title: title ? title.textContent.trim() : null,
+        author: author ? author.textContent.replace(/^by\\s+/i, '').trim() : null,
+    };
+})
+"""
 
-# ---------------------- Cache Handling ---------------------- #
+# Collect metadata from an item's detail page
+DETAIL_META_JS = """
+() => {
+    const text = sel => {
+        const e = document.querySelector(sel);
+        return e ? e.textContent.trim() : null;
+    };
+    const stats = Array.from(document.querySelectorAll('.detailsStatsContainerRight .detailsStatRight'))
+        .map(e => e.textContent.trim());
+    const tags = Array.from(document.querySelectorAll('.workshopTags a')).map(e => e.textContent.trim());
+    const author = document.querySelector('.creatorsBlock .friendBlockContent');
+    return {
+        title: text('.workshopItemTitle'),
+        author: author ? author.childNodes[0].textContent.trim() : null,
+        stats: stats,
+        tags: tags,
+    };
+}
+"""
 
-def load_cache():
-    """Load cache: { tag: { collection_id: set(item_ids) } }"""
-    cache = {}
+
+def _item_id_from_href(href):
+    """Extract the item ID from a filedetails link, or None."""
+    if href and "id=" in href:
+        return href.split("id=")[1].split("&")[0]
+    return None
+
+
+def read_item_details(page):
+    """
+    Parse metadata from the currently loaded item detail page.
+    Returns a dict with title, author, time_published, time_updated and tags, or None.
+    """
     try:
-        for tag in os.listdir(CACHE_DIR):
-            tag_dir = os.path.join(CACHE_DIR, tag)
-            if not os.path.isdir(tag_dir):
-                continue
-            for fname in os.listdir(tag_dir):
-                if not fname.endswith('.json'):
-                    continue
-                cid = fname[:-5]
-                fpath = os.path.join(tag_dir, fname)
-                try:
-                    with open(fpath, 'r') as f:
-                        items = json.load(f)
-                    if isinstance(items, list):
-                        cache.setdefault(tag, {})[cid] = set(str(i) for i in items)
-                except Exception:
-                    pass
+        meta = page.evaluate(DETAIL_META_JS)
     except Exception:
-        pass
-    return cache
+        return None
+    if not meta.get("title"):
+        return None
+    # Stats column is: size, posted date, [updated date]
+    dates = [item_store.parse_steam_date(s) for s in meta.get("stats", [])[1:3]]
+    return {
+        "title": meta["title"],
+        "author": meta.get("author"),
+        "time_published": dates[0] if dates else None,
+        "time_updated": dates[1] if len(dates) > 1 else None,
+        "tags": meta.get("tags") or [],
+    }
 
 
-def save_cache(cache):
-    """Save cache to disk."""
-    for tag, collections in cache.items():
-        tag_dir = os.path.join(CACHE_DIR, tag)
-        os.makedirs(tag_dir, exist_ok=True)
-        for cid, items in collections.items():
-            fpath = os.path.join(tag_dir, f"{cid}.json")
-            with open(fpath, 'w') as f:
-                json.dump(sorted(items), f, indent=2)
+def record_item_details(page, item_id, store):
+    """Record metadata from the currently loaded item detail page into the item store.
+    Returns the parsed details (see read_item_details), or None."""
+    details = read_item_details(page)
+    if details:
+        item_store.record_items(store, [dict(details, item_id=item_id, status=item_store.STATUS_OK)])
+    return details
 
 
-def get_all_cached_items_for_tag(cache, tag):
-    """Get union of all cached items across all collections for a tag."""
-    if tag not in cache:
-        return set()
-    result = set()
-    for items in cache[tag].values():
-        result.update(items)
-    return result
+def _record_status(item_id, status, store=None, registry=None):
+    if store is not None:
+        item_store.record_status(store, item_id, status)
+    if registry is not None:
+        registry.record(item_id, status=status)
 
 
-# ---------------------- Steam Scraping ---------------------- #
-
 def get_collection_items(page, col_id):
     """
     Scrape all item IDs from a Steam collection.
     Returns a set of item IDs (strings), or None on failure.
     """
     try:
-        page.goto(f"{config.SHARED_FILE_DETAILS_URL}{col_id}", timeout=60000, wait_until="domcontentloaded")
+        pacing.goto(page, f"{config.SHARED_FILE_DETAILS_URL}{col_id}", timeout=60000, wait_until="domcontentloaded")
     except PlaywrightTimeoutError:
         print(f"  Timeout loading collection {col_id}")
         return None
@@ -146,10 +287,73 @@ def get_collection_items(page, col_id):
     return items
 
 
-def get_workshop_items(page, tag, known_items):
+def get_collection_members(col_id, timeout=15):
+    """
+    Read a collection's item IDs from the public Web API (GetCollectionDetails).
+    One small JSON request, no browser and no scrolling; may lag behind the site slightly.
+    Returns a set of item IDs, or None if the API couldn't be read.
+    """
+    data = urlencode({"collectioncount": 1, "publishedfileids[0]": str(col_id)}).encode()
+    pacing.pacer.wait()
+    start = time.monotonic()
+    try:
+        with urlopen(Request(config.COLLECTION_DETAILS_API_URL, data=data), timeout=timeout) as resp:
+            details = json.load(resp)["response"]["collectiondetails"][0]
+    except HTTPError as e:
+        pacing.pacer.record(time.monotonic() - start, status=e.code)
+        print(f"  Collection API read failed for {col_id}: HTTP {e.code}")
+        return None
+    except Exception as e:
+        pacing.pacer.record(time.monotonic() - start, failed=True)
+        print(f"  Collection API read failed for {col_id}: {str(e)[:60]}")
+        return None
+    pacing.pacer.record(time.monotonic() - start, status=200)
+    if details.get("result") != 1:
+        return None
+    return {str(child["publishedfileid"]) for child in details.get("children", [])}
+
+
+def get_workshop_page(page, tag, page_num, store=None):
+    """
+    Load one workshop browse page for a tag (sorted by most recent).
+    If an item store connection is given, title/author of every item seen is recorded.
+    Returns the list of item IDs on the page ([] for an empty page), or None on timeout.
+    """
+    url = f"{config.WORKSHOP_BASE_URL}{tag}&browsesort=mostrecent&p={page_num}"
+    try:
+        pacing.goto(page, url, timeout=60000, wait_until="domcontentloaded")
+    except PlaywrightTimeoutError:
+        print(f"  Page {page_num}: timeout loading, stopping")
+        return None
+    
+    # Check for empty page (no items at all on Steam)
+    if page.query_selector("#no_items"):
+        print(f"  Page {page_num}: empty page (end of workshop)")
+        return []
+
+    try:
+        page.wait_for_selector("a.item_link", timeout=10000)
+    except PlaywrightTimeoutError:
+        print(f"  Page {page_num}: timeout loading, stopping")
+        return None
+
+    page_ids = []
+    seen_items = []
+    for tile in page.evaluate(BROWSE_TILES_JS):
+        item_id = _item_id_from_href(tile["href"])
+        if item_id:
+            page_ids.append(item_id)
+            seen_items.append({"item_id": item_id, "title": tile["title"], "author": tile["author"]})
+    if store is not None and seen_items:
+        item_store.record_items(store, seen_items, tag=tag)
+    return page_ids
+
+
+def get_workshop_items(page, tag, known_items, store=None):
     """
     Scrape workshop for new items (sorted by most recent).
     Continues through ALL pages until hitting empty page or max pages.
+    If an item store connection is given, title/author of every item seen is recorded.
     Returns list of new item IDs in order (most recent first).
     """
     new_items = []
@@ -157,33 +361,12 @@ def get_workshop_items(page, tag, known_items):
     consecutive_empty = 0  # Track consecutive pages with no new items
     max_consecutive_empty = 3  # Stop after this many consecutive pages with no new items
     max_pages = 100  # Safety limit
-    base_url = f"{config.WORKSHOP_BASE_URL}{tag}&browsesort=mostrecent&p="
 
     while page_num <= max_pages:
-        try:
-            page.goto(f"{base_url}{page_num}", timeout=60000, wait_until="domcontentloaded")
-        except PlaywrightTimeoutError:
-            print(f"  Page {page_num}: timeout loading, stopping")
-            break
-        
-        # Check for empty page (no items at all on Steam)
-        if page.query_selector("#no_items"):
-            print(f"  Page {page_num}: empty page (end of workshop)")
+        page_ids = get_workshop_page(page, tag, page_num, store=store)
+        if not page_ids:
             break
 
-        try:
-            page.wait_for_selector("a.item_link", timeout=10000)
-        except PlaywrightTimeoutError:
-            print(f"  Page {page_num}: timeout loading, stopping")
-            break
-
-        elements = page.query_selector_all("a.item_link")
-        page_ids = []
-        for e in elements:
-            href = e.get_attribute("href")
-            if href and "id=" in href:
-                page_ids.append(href.split("id=")[1].split("&")[0])
-
         # Find new items on this page
         new_on_page = [i for i in page_ids if i not in known_items]
         
@@ -204,9 +387,82 @@ def get_workshop_items(page, tag, known_items):
     return new_items
 
 
-def add_to_collection(page, item_id, col_id, retries=3, debug=False):
+def set_collection_order(page, col_id, ordered_ids, sort_url=None):
+    """
+    Set the order of a collection's items in one request, first ID on top.
+
+    Posts the full child list to the collection sort endpoint with the session's
+    cookies and sessionid (as the collection editor does).
+
+    Args:
+        ordered_ids: All item IDs of the collection, in the desired order.
+        sort_url: Endpoint to post to (defaults to config.COLLECTION_SORT_URL;
+                  override to use a local stand-in).
+
+    Returns True on success, False otherwise.
+    """
+    url = sort_url or config.COLLECTION_SORT_URL
+    session_id = next((c["value"] for c in page.context.cookies(url) if c["name"] == "sessionid"), None)
+    if not session_id:
+        print(f"  Can't reorder collection {col_id}: no sessionid cookie (not logged in?)")
+        return False
+    form = [("sessionid", session_id), ("id", str(col_id))]
+    form += [("childids[]", str(item_id)) for item_id in ordered_ids]
+    pacing.pacer.wait()
+    start = time.monotonic()
+    try:
+        response = page.request.post(
+            url,
+            data=urlencode(form),
+            headers={"Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"},
+            timeout=60000,
+        )
+    except Exception as e:
+        pacing.pacer.record(time.monotonic() - start, failed=True)
+        print(f"  Failed to reorder collection {col_id}: {str(e)[:60]}")
+        return False
+    pacing.pacer.record(time.monotonic() - start, status=response.status)
+    if not response.ok:
+        print(f"  Failed to reorder collection {col_id}: HTTP {response.status}")
+        return False
+    try:
+        result = response.json()
+    except Exception:
+        result = {}
+    if result.get("success") not in (1, True):
+        print(f"  Failed to reorder collection {col_id}: {result or 'unexpected response'}")
+        return False
+    return True
+
+
+def is_item_in_collection(page, item_id, col_id):
+    """
+    Check through the item's "Add to Collection" dialog whether it is already in
+    a collection, without changing anything.
+    Returns True/False, or None if it couldn't be determined.
+    """
+    try:
+        pacing.goto(page, f"{config.SHARED_FILE_DETAILS_URL}{item_id}", timeout=60000, wait_until="domcontentloaded")
+        add_btn = page.query_selector(".general_btn[onclick*='AddToCollection']")
+        if not add_btn:
+            return None
+        add_btn.click()
+        page.wait_for_selector("#AddToCollectionDialog", timeout=12000, state="visible")
+        checkbox = page.wait_for_selector(f'[id="{col_id}"]', timeout=12000)
+        return checkbox.is_checked()
+    except Exception:
+        return None
+
+
+def add_to_collection(page, item_id, col_id, retries=3, debug=False, store=None, registry=None, tag=None):
     """
     Add an item to a collection.
+    If an item store connection is given, the detail page metadata (and
+    unavailable status) is recorded while we are on the page anyway.
+    If an ItemRegistry is given, the item's status and tags are shared with the
+    other tags' loops; with `tag` as well, collections of the item's other tags
+    are ticked in the same dialog (see ItemRegistry.extra_targets) so the item
+    is visited once per run.
     Returns True if successful, False otherwise.
     """
     wait_timeout = 12000  # milliseconds
@@ -214,16 +470,27 @@ def add_to_collection(page, item_id, col_id, retries=3, debug=False):
     for attempt in range(1, retries + 1):
         try:
             try:
-                page.goto(f"{config.SHARED_FILE_DETAILS_URL}{item_id}", timeout=60000, wait_until="domcontentloaded")
+                pacing.goto(page, f"{config.SHARED_FILE_DETAILS_URL}{item_id}", timeout=60000, wait_until="domcontentloaded")
             except PlaywrightTimeoutError:
                 print(f"    Timeout loading item {item_id}")
+                # Don't burn the remaining retries on a dead or hung browser
+                if not page_is_alive(page):
+                    print(f"    Browser not responding")
+                    return False
                 if attempt < retries:
-                    time.sleep(2)
-                    continue
+                    continue  # The pacer has backed off; the next goto waits accordingly
                 else:
                     return False
             time.sleep(1)
             
+            details = None
+            if store is not None:
+                details = record_item_details(page, item_id, store)
+            elif registry is not None:
+                details = read_item_details(page)
+            if registry is not None and details:
+                registry.record(item_id, status=item_store.STATUS_OK, tags=details["tags"])
+            
             # Debug: Check if add button exists
             add_btn = page.query_selector(".general_btn[onclick*='AddToCollection']")
             if not add_btn:
@@ -239,10 +506,12 @@ def add_to_collection(page, item_id, col_id, retries=3, debug=False):
                 file_not_found = page.query_selector("text=File Not Found")
                 if error_box or file_not_found:
                     print(f"    Item not available (deleted/removed)")
+                    _record_status(item_id, item_store.STATUS_UNAVAILABLE, store, registry)
                     return False
                 # Check if it's a collection page instead of item page
                 if "/collections/" in page.url or page.query_selector(".collectionChildren"):
                     print(f"    Not an item page")
+                    _record_status(item_id, item_store.STATUS_NOT_ITEM, store, registry)
                     return False
                 raise Exception("Add to Collection button not found")
             
@@ -266,6 +535,17 @@ def add_to_collection(page, item_id, col_id, retries=3, debug=False):
                 if debug:
                     print(f"    Already checked")
             
+            # Tick the item's other tags' collections too, so those tags don't visit it again
+            extra_ticked = []
+            if registry is not None and tag is not None and details:
+                for extra_col, extra_tag in registry.extra_targets(item_id, details["tags"], tag).items():
+                    extra = page.query_selector(f'[id="{extra_col}"]')
+                    if not extra:
+                        continue
+                    if not extra.is_checked():
+                        extra.click()
+                        extra_ticked.append((extra_tag, extra_col))
+            
             # Click OK/Save button - try different selectors
             ok_btn = page.query_selector(".btn_green_steamui.btn_medium")
             if not ok_btn:
@@ -285,6 +565,8 @@ def add_to_collection(page, item_id, col_id, retries=3, debug=False):
                 pass  # Dialog might close differently
             
             time.sleep(0.5)
+            for extra_tag, extra_col in extra_ticked:
+                registry.record_cross_add(item_id, extra_tag, extra_col)
             return True
             
         except Exception as e:
@@ -292,7 +574,7 @@ def add_to_collection(page, item_id, col_id, retries=3, debug=False):
             if attempt < retries:
                 if debug:
                     print(f"    Attempt {attempt} failed: {error_msg}, retrying...")
-                time.sleep(2)
+                # No wait here: the retry's pacing.goto waits for its slot
             else:
                 # Truncate long error messages
                 if len(error_msg) > 60:
@@ -1,18 +1,81 @@
 import os
 import sys
 import time
-from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 import config
+from collection_state import load_cache
 
 
-def subscribe_to_collection(collection_id="3445118133"):
+# ---------------------- Local Pre-check ---------------------- #
+
+def list_local_items(content_dir=None):
+    """Return the set of item IDs downloaded into the workshop content folder, or None if it doesn't exist."""
+    content_dir = content_dir or config.STEAM_WORKSHOP_CONTENT_DIR
+    if not os.path.isdir(content_dir):
+        return None
+    return {name for name in os.listdir(content_dir)
+            if name.isdigit() and os.path.isdir(os.path.join(content_dir, name))}
+
+
+def cached_collection_items(collection_id, cache=None):
+    """Return the cached item IDs of a collection (from cache/<tag>/<id>.json), or None if it isn't cached."""
+    cache = cache if cache is not None else load_cache()
+    for collections in cache.values():
+        if str(collection_id) in collections:
+            return collections[str(collection_id)]
+    return None
+
+
+def _dead_items():
+    """Items the scrapers found deleted on Steam; they never download, so they can't be missing."""
+    if not os.path.exists(config.ITEM_DB_PATH):
+        return set()
+    import item_store
+    conn = item_store.connect()
+    try:
+        return (item_store.items_with_status(conn, item_store.STATUS_UNAVAILABLE)
+                | item_store.items_with_status(conn, item_store.STATUS_NOT_ITEM))
+    finally:
+        conn.close()
+
+
+def missing_local_items(collection_id, content_dir=None, cache=None, dead_items=None):
+    """
+    Diff a collection's cached items against the local workshop content folder.
+    
+    Returns the set of item IDs not downloaded yet, or None if either side is
+    unknown (no content folder or collection not cached) and the browser has to check.
+    """
+    local = list_local_items(content_dir)
+    cached = cached_collection_items(collection_id, cache)
+    if local is None or cached is None:
+        return None
+    dead_items = dead_items if dead_items is not None else _dead_items()
+    return set(cached) - local - dead_items
+
+
+# ---------------------- Browser Subscribe ---------------------- #
+
+def subscribe_to_collection(collection_id="3445118133", precheck=True):
     """
     Subscribe to all items in a Steam workshop collection.
     
     Args:
         collection_id (str): The ID of the collection to subscribe to
+        precheck (bool): Skip the browser if every cached item is already in the
+                         local workshop content folder
     """
-    playwright, context, page = config.configure_browser()
+    if precheck:
+        missing = missing_local_items(collection_id)
+        if missing is not None and not missing:
+            print(f"All items of collection {collection_id} are already downloaded; skipping browser.")
+            return 0
+        if missing:
+            print(f"{len(missing)} item(s) of collection {collection_id} not downloaded yet.")
+    
+    # Imported here so the local pre-check doesn't pay for Playwright
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+    
+    playwright, context, page, _ = config.configure_browser()
     
     try:
         print(f"Navigating to collection {collection_id}...")
@@ -108,8 +171,8 @@ def main():
     # Subscribe to each collection ID
     for col_id in col_ids:
         success = subscribe_to_collection(col_id)
-        # Provide feedback for each
-        if success:
+        # Provide feedback for each (0 means nothing needed subscribing)
+        if success is not None and success is not False:
             print(f"✅ Subscribed to collection ID {col_id} successfully.")
         else:
             print(f"❌ Subscription failed for collection ID {col_id}.")
@@ -0,0 +1,108 @@
+"""
+Shared fixtures: a local stand-in for Steam pages and endpoints, and a browser
+page for the tests that drive real forms (skipped when Chromium isn't installed).
+"""
+
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StandIn:
+    """
+    Tiny HTTP server answering from a route table.
+
+    routes: { path: callable(request) -> (status, headers, body) }, where request
+    is {"method", "path", "query", "form"}; every request is appended to `requests`.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                request = {"method": method, "path": url.path, "query": parse_qs(url.query),
+                           "form": parse_qs(body)}
+                stand_in.requests.append(request)
+                route = stand_in.routes.get(url.path)
+                status, headers, payload = route(request) if route else (404, {}, "not found")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", headers.get("Content-Type", "text/html; charset=utf-8"))
+                self.end_headers()
+                self.wfile.write(payload.encode("utf-8"))
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    yield server
+    server.close()
+
+
+@pytest.fixture(scope="session")
+def playwright():
+    from playwright.sync_api import sync_playwright
+    pw = sync_playwright().start()
+    yield pw
+    pw.stop()
+
+
+@pytest.fixture(scope="session")
+def browser(playwright):
+    try:
+        browser = playwright.chromium.launch()
+    except Exception as e:
+        pytest.skip(f"Chromium not available ({str(e).splitlines()[0]})")
+    yield browser
+    browser.close()
+
+
+@pytest.fixture
+def page(browser):
+    context = browser.new_context()
+    page = context.new_page()
+    yield page
+    context.close()
+
+
+@pytest.fixture
+def state_files(tmp_path, monkeypatch):
+    """Point the shared state files (lock, overlay, locked and failed lists) at tmp_path."""
+    import config
+    import collection_state
+    monkeypatch.setattr(config, "STATE_LOCK_PATH", str(tmp_path / "state.lock"))
+    monkeypatch.setattr(config, "COLLECTION_OVERLAY_FILE", str(tmp_path / "collections_overlay.json"))
+    monkeypatch.setattr(collection_state, "LOCKED_FILE", str(tmp_path / "locked_collections.json"))
+    monkeypatch.setattr(collection_state, "FAILED_FILE", str(tmp_path / "failed_items.json"))
+    return tmp_path
@@ -0,0 +1,79 @@
+"""Collection ordering: newest-first sorting and the sort request against a local stand-in endpoint."""
+
+import json
+
+import pytest
+
+import item_store
+import steam_collection_bot as bot
+
+
+class StandInPage:
+    """The parts of a page set_collection_order uses: cookies and the request context."""
+
+    class Context:
+        def __init__(self, cookies):
+            self._cookies = cookies
+
+        def cookies(self, url):
+            return self._cookies
+
+    def __init__(self, request, cookies):
+        self.request = request
+        self.context = self.Context(cookies)
+
+
+@pytest.fixture
+def request_context(playwright):
+    context = playwright.request.new_context()
+    yield context
+    context.dispose()
+
+
+@pytest.fixture
+def sort_endpoint(stand_in):
+    stand_in.reply = (200, {"Content-Type": "application/json"}, json.dumps({"success": 1}))
+    stand_in.routes["/sort"] = lambda request: stand_in.reply
+    stand_in.sort_url = stand_in.url + "/sort"
+    return stand_in
+
+
+def logged_in(request_context):
+    return StandInPage(request_context, [{"name": "sessionid", "value": "abc123"}])
+
+
+def test_sort_posts_full_order(request_context, sort_endpoint):
+    assert bot.set_collection_order(logged_in(request_context), "3600000001", ["30", "20", "10"],
+                                    sort_url=sort_endpoint.sort_url)
+    form = sort_endpoint.requests[0]["form"]
+    assert form["sessionid"] == ["abc123"]
+    assert form["id"] == ["3600000001"]
+    assert form["childids[]"] == ["30", "20", "10"]
+
+
+@pytest.mark.parametrize("reply", [
+    (500, {}, "Internal error"),
+    (200, {"Content-Type": "application/json"}, json.dumps({"success": 2})),
+    (200, {}, "<html>not json</html>"),
+])
+def test_sort_reports_failure(request_context, sort_endpoint, reply):
+    sort_endpoint.reply = reply
+    assert not bot.set_collection_order(logged_in(request_context), "3600000001", ["1"],
+                                        sort_url=sort_endpoint.sort_url)
+
+
+def test_sort_needs_session_cookie(request_context, sort_endpoint):
+    page = StandInPage(request_context, [])
+    assert not bot.set_collection_order(page, "3600000001", ["1"], sort_url=sort_endpoint.sort_url)
+    assert not sort_endpoint.requests
+
+
+def test_sort_newest_first():
+    conn = item_store.connect(":memory:")
+    item_store.record_items(conn, [
+        {"item_id": "100", "time_published": 1000},
+        {"item_id": "300", "time_published": 3000},
+        {"item_id": "200", "time_published": 2000},
+    ])
+    # Unknown publish times go last, newest ID first
+    assert item_store.sort_newest_first(conn, ["5", "100", "7", "300", "200"]) == ["300", "200", "100", "7", "5"]
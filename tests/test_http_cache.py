@@ -0,0 +1,136 @@
+"""Page cache storage: LRU eviction, freshness, validators and invalidation."""
+
+import pytest
+
+import http_cache
+from http_cache import ResponseCache
+
+URL = "https://steamcommunity.com/workshop/browse/?appid=2269950&p="
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(http_cache.time, "time", lambda: clock["now"])
+    return clock
+
+
+def fill(cache, clock, pages, size=100):
+    keys = {}
+    for page in pages:
+        clock["now"] += 1
+        keys[page] = ResponseCache.make_key(f"{URL}{page}")
+        cache.store(keys[page], f"{URL}{page}", {}, b"x" * size)
+    return keys
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=300, ttl=60)
+    keys = fill(cache, clock, [1, 2, 3])
+    clock["now"] += 1
+    cache.touch(keys[1])
+    keys.update(fill(cache, clock, [4]))
+    assert cache.lookup(keys[2]) is None
+    assert all(cache.lookup(keys[p]) for p in (1, 3, 4))
+    assert not (tmp_path / f"{keys[2]}.html").exists()
+
+
+def test_oversized_body_not_stored(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=300, ttl=60)
+    keys = fill(cache, clock, [1], size=301)
+    assert cache.lookup(keys[1]) is None
+
+
+def test_index_survives_reopen(tmp_path, clock):
+    keys = fill(ResponseCache(str(tmp_path), max_bytes=300, ttl=60), clock, [1])
+    cache = ResponseCache(str(tmp_path), max_bytes=300, ttl=60)
+    assert cache.read_body(keys[1]) == b"x" * 100
+
+
+def test_freshness_and_revalidation(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=300, ttl=60)
+    key = ResponseCache.make_key(URL + "1")
+    cache.store(key, URL + "1", {"etag": 'W/"abc"', "last-modified": "Mon, 19 Oct 2026 10:00:00 GMT",
+                                 "set-cookie": "x=1"}, b"page")
+    entry = cache.lookup(key)
+    assert cache.is_fresh(entry, now=clock["now"] + 59)
+    assert not cache.is_fresh(entry, now=clock["now"] + 61)
+    assert cache.conditional_headers(entry) == {"if-none-match": 'W/"abc"',
+                                                "if-modified-since": "Mon, 19 Oct 2026 10:00:00 GMT"}
+    clock["now"] += 100
+    cache.touch(key, revalidated=True)
+    assert cache.is_fresh(cache.lookup(key), now=clock["now"] + 59)
+
+
+def test_key_depends_on_login_not_tracking_cookies():
+    base = ResponseCache.make_key(URL + "1")
+    assert ResponseCache.make_key(URL + "1", {"_ga": "x"}) == base
+    assert ResponseCache.make_key(URL + "1", {"steamLoginSecure": "abc"}) != base
+
+
+def test_invalidate_drops_url_variants(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000, ttl=60)
+    col = "https://steamcommunity.com/sharedfiles/filedetails/?id=3600000001"
+    for url in (col, col + "&searchtext=", col + "1"):
+        cache.store(ResponseCache.make_key(url), url, {}, b"page")
+    cache.invalidate(col)
+    assert [e["url"] for e in cache.index.values()] == [col + "1"]
+
+
+class StandInRoute:
+    """The parts of a Playwright route handle_route uses."""
+
+    def __init__(self, url, status=200, body=b"<title>Workshop</title>", error=None):
+        self.request = type("Request", (), {"url": url, "method": "GET", "resource_type": "document",
+                                            "headers": {}})()
+        self.response = type("Response", (), {"status": status, "headers": {}, "body": lambda _: body,
+                                               "text": lambda _: body.decode("utf-8")})()
+        self.error = error
+        self.fulfilled = []
+        self.aborted = False
+
+    def fetch(self, **kwargs):
+        if self.error:
+            raise self.error
+        return self.response
+
+    def fulfill(self, **kwargs):
+        self.fulfilled.append(kwargs)
+
+    def abort(self):
+        self.aborted = True
+
+
+class StandInContext:
+    def cookies(self, url):
+        return []
+
+
+@pytest.fixture
+def fast_pacer(monkeypatch):
+    monkeypatch.setattr(http_cache.pacing, "pacer", http_cache.pacing.Pacer(100.0, 0.1, 100.0))
+
+
+def test_handle_route_stores_then_serves_from_disk(tmp_path, clock, fast_pacer):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000, ttl=60)
+    cache.handle_route(StandInRoute(URL + "1"), StandInContext())
+    route = StandInRoute(URL + "1", error=AssertionError("should not reach Steam"))
+    cache.handle_route(route, StandInContext())
+    assert route.fulfilled[0]["body"] == b"<title>Workshop</title>"
+    assert cache.stats == {"fresh": 1, "revalidated": 0, "fetched": 1}
+
+
+def test_handle_route_does_not_store_throttle_page(tmp_path, clock, fast_pacer):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000, ttl=60)
+    throttle = b"<title>Steam Community :: Error</title>You've made too many requests recently."
+    route = StandInRoute(URL + "1", body=throttle)
+    cache.handle_route(route, StandInContext())
+    assert route.fulfilled
+    assert cache.index == {}
+
+
+def test_handle_route_aborts_failed_fetch(tmp_path, clock, fast_pacer):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000, ttl=60)
+    route = StandInRoute(URL + "1", error=TimeoutError("timed out"))
+    cache.handle_route(route, StandInContext())
+    assert route.aborted and not route.fulfilled
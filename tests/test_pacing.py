@@ -0,0 +1,73 @@
+"""Adaptive pacing: AIMD rate changes and throttle-page detection."""
+
+import pytest
+
+import config
+import pacing
+from pacing import Pacer
+
+THROTTLE_HTML = "<html><head><title>Steam Community :: Error</title></head>" \
+                "<body>You've made too many requests recently.</body></html>"
+
+
+@pytest.fixture(autouse=True)
+def pacing_config(monkeypatch):
+    monkeypatch.setattr(config, "PACING_RATE_STEP", 0.1)
+    monkeypatch.setattr(config, "PACING_BACKOFF", 0.5)
+    monkeypatch.setattr(config, "PACING_SLOW_FACTOR", 3.0)
+    monkeypatch.setattr(config, "PACING_LATENCY_SMOOTHING", 0.2)
+
+
+def test_clean_responses_speed_up_to_max():
+    pacer = Pacer(initial_rate=1.0, min_rate=0.1, max_rate=1.25)
+    pacer.record(0.5, status=200)
+    assert pacer.rate == pytest.approx(1.1)
+    for _ in range(5):
+        pacer.record(0.5, status=200)
+    assert pacer.rate == 1.25
+
+
+@pytest.mark.parametrize("outcome", [{"status": 429}, {"status": 503}, {"failed": True}])
+def test_throttling_halves_rate(outcome):
+    pacer = Pacer(initial_rate=2.0, min_rate=0.1, max_rate=4.0)
+    pacer.record(0.5, **outcome)
+    assert pacer.rate == 1.0
+    assert pacer.throttled == 1
+
+
+def test_slow_response_counts_as_throttling():
+    pacer = Pacer(initial_rate=2.0, min_rate=0.1, max_rate=4.0)
+    pacer.record(1.0, status=200)
+    pacer.record(5.0, status=200)
+    assert pacer.rate == pytest.approx(1.05)
+
+
+def test_rate_never_drops_below_min():
+    pacer = Pacer(initial_rate=0.3, min_rate=0.2, max_rate=4.0)
+    pacer.record(0.5, status=429)
+    pacer.record(0.5, status=429)
+    assert pacer.rate == 0.2
+
+
+def test_is_throttle_html():
+    assert pacing.is_throttle_html(THROTTLE_HTML)
+    # A deleted item's error page isn't throttling
+    assert not pacing.is_throttle_html("<title>Steam Community :: Error</title>There was a problem")
+    assert not pacing.is_throttle_html(None)
+
+
+class StandInRoute:
+    def __init__(self, status, body):
+        self.response = type("Response", (), {"status": status, "text": lambda _: body})()
+
+    def fetch(self, **kwargs):
+        return self.response
+
+
+def test_fetch_reports_throttle_page_as_429(monkeypatch):
+    monkeypatch.setattr(pacing, "pacer", Pacer(initial_rate=100.0, min_rate=0.1, max_rate=100.0))
+    _, status = pacing.fetch(StandInRoute(200, THROTTLE_HTML))
+    assert status == 429
+    assert pacing.pacer.rate == 50.0
+    _, status = pacing.fetch(StandInRoute(200, "<title>Workshop</title>"))
+    assert status == 200
@@ -0,0 +1,39 @@
+"""Pool fill planning: oldest items to the earliest collection with room, locked ones skipped."""
+
+import pytest
+
+import config
+import collection_state
+from update_pipeline import plan_targets
+
+COLLECTIONS = ["3600000001", "3600000002", "3600000003"]
+
+
+@pytest.fixture(autouse=True)
+def small_collections(monkeypatch, state_files):
+    monkeypatch.setattr(config, "MAX_COLLECTION_ITEMS", 3)
+
+
+def test_fills_in_collection_order():
+    cache = {"Maps": {"3600000001": {"1", "2"}}}
+    plan = plan_targets("Maps", ["10", "11", "12", "13", "14"], COLLECTIONS, cache, {})
+    assert plan == [("10", "3600000001"), ("11", "3600000002"), ("12", "3600000002"),
+                    ("13", "3600000002"), ("14", "3600000003")]
+
+
+def test_live_counts_override_cache():
+    cache = {"Maps": {"3600000001": set()}}
+    plan = plan_targets("Maps", ["10", "11"], COLLECTIONS, cache, {"3600000001": 3})
+    assert plan == [("10", "3600000002"), ("11", "3600000002")]
+
+
+def test_skips_locked_collections():
+    collection_state.lock_collection("3600000001")
+    plan = plan_targets("Maps", ["10"], COLLECTIONS, {}, {})
+    assert plan == [("10", "3600000002")]
+
+
+def test_leaves_out_items_beyond_free_space():
+    plan = plan_targets("Maps", [str(i) for i in range(12)], COLLECTIONS, {}, {})
+    assert len(plan) == 9
+    assert [item for item, _ in plan] == [str(i) for i in range(9)]
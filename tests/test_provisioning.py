@@ -0,0 +1,91 @@
+"""Collection provisioning against a local stand-in for Steam's create form and collection list."""
+
+import html
+
+import pytest
+
+import config
+import steam_collection_bot as bot
+
+CREATE_FORM = """
+<form action="/create" method="post">
+  <input name="title"><textarea name="description"></textarea>
+  <button type="submit">Save and Continue</button>
+</form>
+"""
+
+
+def own_collections_page(collections):
+    tiles = "".join(
+        f'<div class="workshopItem"><a href="/sharedfiles/filedetails/?id={col_id}">'
+        f'<div class="workshopItemTitle">{html.escape(title)}</div></a></div>'
+        for title, col_id in collections.items())
+    return f"<html><body>{tiles}</body></html>"
+
+
+@pytest.fixture
+def steam(stand_in, monkeypatch, state_files):
+    """Stand-in Steam: a create form that makes collection 3600000900, and the user's collection list."""
+    monkeypatch.setattr(config, "COLLECTION_IDS", {"Maps": []})
+    stand_in.own = {}
+    stand_in.redirect_to = "/manage?id=3600000900"
+
+    def create(request):
+        if request["method"] == "GET":
+            return 200, {}, CREATE_FORM
+        stand_in.own[request["form"]["title"][0]] = "3600000900"
+        return 303, {"Location": stand_in.redirect_to}, ""
+
+    stand_in.routes = {
+        "/create": create,
+        "/manage": lambda request: (200, {}, "<html><body>Manage</body></html>"),
+        "/mine": lambda request: (200, {}, own_collections_page(stand_in.own)),
+    }
+    stand_in.create_url = stand_in.url + "/create"
+    stand_in.list_url = stand_in.url + "/mine"
+    return stand_in
+
+
+def created(steam):
+    return [r for r in steam.requests if r["path"] == "/create" and r["method"] == "POST"]
+
+
+def test_create_collection_returns_new_id(page, steam):
+    assert bot.create_collection(page, "Maps #1", "desc", create_url=steam.create_url) == "3600000900"
+    assert created(steam)[0]["form"]["title"] == ["Maps #1"]
+
+
+def test_list_own_collections(page, steam):
+    steam.own = {"Tracks #1": "3600000001", "Maps #1": "3600000002"}
+    assert bot.list_own_collections(page, list_url=steam.list_url) == steam.own
+
+
+def test_provision_registers_new_collection(page, steam):
+    col_id = bot.provision_collection(page, "Maps", create_url=steam.create_url, list_url=steam.list_url)
+    assert col_id == "3600000900"
+    assert config.COLLECTION_IDS["Maps"] == ["3600000900"]
+    assert config.load_collection_overlay() == {"Maps": ["3600000900"]}
+    title = created(steam)[0]["form"]["title"][0]
+    assert title == config.PROVISION_TITLE_TEMPLATE.format(
+        game=config.APPS[config.APP_ID]["name"], tag="Maps", number=1)
+
+
+def test_provision_reuses_existing_collection(page, steam):
+    title = config.PROVISION_TITLE_TEMPLATE.format(game=config.APPS[config.APP_ID]["name"], tag="Maps", number=1)
+    steam.own = {title: "3600000555"}
+    col_id = bot.provision_collection(page, "Maps", create_url=steam.create_url, list_url=steam.list_url)
+    assert col_id == "3600000555"
+    assert not created(steam)
+
+
+def test_provision_finds_collection_whose_id_was_not_read_back(page, steam):
+    steam.redirect_to = "/manage"  # No ?id= to parse: create_collection gives up
+    col_id = bot.provision_collection(page, "Maps", create_url=steam.create_url, list_url=steam.list_url)
+    assert col_id == "3600000900"
+    assert len(created(steam)) == 1
+
+
+def test_provision_creates_nothing_when_list_unreadable(page, steam):
+    steam.routes["/mine"] = lambda request: (500, {}, "Internal error")
+    assert bot.provision_collection(page, "Maps", create_url=steam.create_url, list_url=steam.list_url) is None
+    assert not created(steam)
@@ -0,0 +1,42 @@
+"""Subscription pre-check against a synthetic workshop content folder."""
+
+import subscribe_collection as sub
+
+CACHE = {"Maps": {"3600000001": {"11", "12", "13", "14"}}}
+
+
+def make_content_dir(tmp_path, item_ids, files=()):
+    content_dir = tmp_path / "content" / "2269950"
+    content_dir.mkdir(parents=True)
+    for item_id in item_ids:
+        (content_dir / item_id).mkdir()
+    for name in files:
+        (content_dir / name).write_text("")
+    return str(content_dir)
+
+
+def test_list_local_items_only_counts_item_folders(tmp_path):
+    content_dir = make_content_dir(tmp_path, ["11", "12", "notes"], files=["13"])
+    assert sub.list_local_items(content_dir) == {"11", "12"}
+
+
+def test_list_local_items_missing_folder(tmp_path):
+    assert sub.list_local_items(str(tmp_path / "nope")) is None
+
+
+def test_missing_local_items(tmp_path):
+    content_dir = make_content_dir(tmp_path, ["11", "12", "99"])
+    missing = sub.missing_local_items("3600000001", content_dir=content_dir, cache=CACHE, dead_items={"14"})
+    assert missing == {"13"}
+
+
+def test_nothing_missing(tmp_path):
+    content_dir = make_content_dir(tmp_path, ["11", "12", "13", "14"])
+    assert sub.missing_local_items("3600000001", content_dir=content_dir, cache=CACHE, dead_items=set()) == set()
+
+
+def test_unknown_side_means_browser_check(tmp_path):
+    content_dir = make_content_dir(tmp_path, ["11"])
+    assert sub.missing_local_items("3600000999", content_dir=content_dir, cache=CACHE, dead_items=set()) is None
+    assert sub.missing_local_items("3600000001", content_dir=str(tmp_path / "nope"), cache=CACHE,
+                                   dead_items=set()) is None
@@ -0,0 +1,36 @@
+"""Title routing: normalization, longest match, typo tolerance."""
+
+from title_router import TitleIndex, normalize
+
+NAMES = {
+    "Bosses": ["Polar", "Polar’s Father", "Tormented Countess"],
+    "Maps": ["Embers", "Shattered Lighthouse"],
+}
+
+
+def test_normalize():
+    assert normalize("Polar’s  Fáther!") == ["polars", "father"]
+
+
+def test_longest_name_wins():
+    index = TitleIndex(NAMES)
+    assert index.match("Polar's Father skin") == [("Bosses", "Polar’s Father")]
+    assert index.match("Polar recolor") == [("Bosses", "Polar")]
+
+
+def test_one_typo_in_multi_word_names():
+    index = TitleIndex(NAMES)
+    assert index.match("Tormented Countes retexture") == [("Bosses", "Tormented Countess")]
+    assert index.match("Shatterred Lighthouse") == [("Maps", "Shattered Lighthouse")]
+
+
+def test_single_word_names_match_exactly():
+    index = TitleIndex(NAMES)
+    assert index.match("Ember glow") == []
+    assert index.match("Embers glow") == [("Maps", "Embers")]
+
+
+def test_route_groups_items():
+    index = TitleIndex(NAMES)
+    titles = {"1": "Polar & Embers", "2": "Shattered Lighthouse HD", "3": "Unrelated"}
+    assert index.route(titles) == {"Bosses": {"1"}, "Maps": {"1", "2"}}
@@ -0,0 +1,47 @@
+"""Watch-mode polling schedule: intervals from upload rates, due order, failures."""
+
+import pytest
+
+import config
+from watch_schedule import TagSchedule
+
+
+@pytest.fixture(autouse=True)
+def schedule_config(monkeypatch):
+    monkeypatch.setattr(config, "WATCH_MIN_INTERVAL", 300)
+    monkeypatch.setattr(config, "WATCH_MAX_INTERVAL", 3600)
+    monkeypatch.setattr(config, "WATCH_TARGET_NEW_PER_POLL", 2)
+    monkeypatch.setattr(config, "WATCH_RATE_SMOOTHING", 0.5)
+
+
+def test_interval_follows_rate():
+    schedule = TagSchedule(["Characters", "Maps", "Wheels"],
+                           initial_rates={"Characters": 60, "Maps": 4}, now=0)
+    assert schedule.interval("Characters") == 300   # 2 min, clamped up
+    assert schedule.interval("Maps") == 1800
+    assert schedule.interval("Wheels") == 3600      # No uploads seen yet
+
+
+def test_everything_due_at_start_then_most_overdue_first():
+    schedule = TagSchedule(["Maps", "Wheels"], initial_rates={"Maps": 4}, now=0)
+    assert set(schedule.due(now=0)) == {"Maps", "Wheels"}
+    schedule.mark_polled("Maps", now=0)
+    schedule.mark_polled("Wheels", now=0)
+    assert schedule.due(now=1799) == []
+    assert schedule.due(now=4000) == ["Maps", "Wheels"]
+    assert schedule.seconds_until_next(now=1000) == 800
+
+
+def test_record_poll_smooths_rate():
+    schedule = TagSchedule(["Maps"], initial_rates={"Maps": 4}, now=0)
+    schedule.mark_polled("Maps", now=0)
+    schedule.record_poll("Maps", 6, now=1800)  # 12/h observed
+    assert schedule.rates["Maps"] == 8
+    assert schedule.next_poll["Maps"] == 1800 + 900
+
+
+def test_failure_retries_soon_without_touching_rate():
+    schedule = TagSchedule(["Maps"], initial_rates={"Maps": 4}, now=0)
+    schedule.record_failure("Maps", now=100)
+    assert schedule.next_poll["Maps"] == 400
+    assert schedule.rates["Maps"] == 4
@@ -0,0 +1,63 @@
+"""Work queue leasing: claim order, expiry and reclaim, retries and hand-back."""
+
+import pytest
+
+import work_queue as wq
+
+
+@pytest.fixture
+def conn():
+    conn = wq.connect(":memory:")
+    wq.enqueue(conn, [("2269950", "Maps"), ("2269950", "Tracks")], now=0)
+    return conn
+
+
+def test_claim_longest_waiting_first(conn):
+    assert wq.claim(conn, "a", lease_seconds=60, now=1) == ("2269950", "Maps")
+    assert wq.claim(conn, "b", lease_seconds=60, now=2) == ("2269950", "Tracks")
+    assert wq.claim(conn, "c", lease_seconds=60, now=3) is None
+
+
+def test_expired_lease_is_reclaimed(conn):
+    wq.claim(conn, "a", lease_seconds=60, now=1)
+    wq.claim(conn, "a", lease_seconds=60, now=1)
+    assert wq.claim(conn, "b", lease_seconds=60, now=30) is None
+    assert wq.claim(conn, "b", lease_seconds=60, now=100) is not None
+    # The old owner can no longer extend or finish the reclaimed job
+    assert not wq.heartbeat(conn, "2269950", "Maps", "a", lease_seconds=60, now=101)
+    assert not wq.complete(conn, "2269950", "Maps", "a", now=101)
+
+
+def test_heartbeat_keeps_lease(conn):
+    wq.claim(conn, "a", lease_seconds=60, now=1)
+    wq.claim(conn, "a", lease_seconds=60, now=1)
+    assert wq.heartbeat(conn, "2269950", "Maps", "a", lease_seconds=60, now=50)
+    assert wq.heartbeat(conn, "2269950", "Tracks", "a", lease_seconds=60, now=50)
+    assert wq.claim(conn, "b", lease_seconds=60, now=100) is None
+
+
+def test_fail_requeues_then_parks():
+    conn = wq.connect(":memory:")
+    wq.enqueue(conn, [("2269950", "Maps")], now=0)
+    for t in range(1, 4):
+        assert wq.claim(conn, "a", lease_seconds=60, now=t) == ("2269950", "Maps")
+        wq.fail(conn, "2269950", "Maps", "a", "boom", max_attempts=3, now=t)
+    assert wq.counts(conn) == {"failed": 1}
+    assert wq.claim(conn, "a", lease_seconds=60, now=5) is None
+
+
+def test_release_does_not_count_as_attempt(conn):
+    for t in range(5):
+        job = wq.claim(conn, "a", lease_seconds=60, now=t)
+        wq.release(conn, *job, "a", now=t)
+    row = conn.execute("SELECT MAX(attempts) AS n FROM jobs").fetchone()
+    assert row["n"] == 0
+
+
+def test_enqueue_leaves_active_jobs_alone(conn):
+    wq.claim(conn, "a", lease_seconds=60, now=1)
+    wq.complete(conn, "2269950", "Maps", "a", now=2)
+    wq.claim(conn, "a", lease_seconds=60, now=3)
+    # Maps is done (re-queued), Tracks is leased (untouched)
+    assert wq.enqueue(conn, [("2269950", "Maps"), ("2269950", "Tracks")], now=4) == 1
+    assert wq.counts(conn) == {"queued": 1, "leased": 1}
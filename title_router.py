@@ -0,0 +1,206 @@
+"""
+Route workshop items into themed sub-collections by title.
+
+Name lists (e.g. CrashBandicootCharacters.json) are compiled once per run into
+a token index:
+
+- names and titles are normalized the same way: accents stripped, case folded,
+  apostrophes dropped ("Polar’s Father", "Polar's father" and "Polars Father"
+  all become "polars father"), everything else non-alphanumeric is a separator
+- each name is indexed under its first token, so a title is matched by looking
+  up each of its tokens once instead of scanning every name
+- within names of two or more words, tokens of FUZZY_MIN_LEN+ characters
+  also match with one typo (missing, extra, wrong or swapped letter) through a
+  precomputed table of one-letter deletions; single-word names must match
+  exactly, since one letter off is usually another word ("Embers", "Hunted")
+
+Matching thousands of stored titles against a few hundred names takes
+milliseconds. Which lists feed which collections is set in
+config.SUBCOLLECTIONS; run this module directly to preview the matches.
+"""
+
+import os
+import re
+import json
+import unicodedata
+import config
+
+# Shorter tokens must match exactly ("Roo" vs "Rob" is not a typo)
+FUZZY_MIN_LEN = 5
+
+_APOSTROPHES = re.compile(r"['’‘`´]")
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Return the list of normalized tokens of a title or name."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = _APOSTROPHES.sub("", text)
+    return _SEPARATORS.sub(" ", text).split()
+
+
+def _deletions(token):
+    """The token itself and every variant with one letter removed."""
+    return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a, b):
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1
+                                  and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    return any(b[:i] + b[i + 1:] == a for i in range(len(b)))
+
+
+def load_names(path, key=None):
+    """Load a name list: a JSON list, or a dict holding the list under `key` (or its only list)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        if key:
+            data = data.get(key, [])
+        else:
+            data = next((v for v in data.values() if isinstance(v, list)), [])
+    return [str(name) for name in data if str(name).strip()]
+
+
+class TitleIndex:
+    """Precomputed index of names, grouped by sub-collection."""
+
+    def __init__(self, names_by_group):
+        """
+        Args:
+            names_by_group: { group: [names] } - a group is usually a sub-collection name.
+        """
+        self.by_first = {}  # first token -> [(tokens, group, name)], longest first
+        self.vocab = set()
+        self.fuzzy = {}     # one-letter deletion -> {name tokens}
+        for group, names in names_by_group.items():
+            for name in names:
+                tokens = tuple(normalize(name))
+                if not tokens:
+                    continue
+                self.by_first.setdefault(tokens[0], []).append((tokens, group, name))
+                self.vocab.update(tokens)
+        for entries in self.by_first.values():
+            entries.sort(key=lambda e: len(e[0]), reverse=True)
+        for token in self.vocab:
+            if len(token) >= FUZZY_MIN_LEN:
+                for variant in _deletions(token):
+                    self.fuzzy.setdefault(variant, set()).add(token)
+        self._seen = {}  # title token -> matching name tokens (titles repeat words a lot)
+
+    def _candidates(self, token):
+        """Name tokens a title token can stand for (itself, or one typo away)."""
+        cached = self._seen.get(token)
+        if cached is not None:
+            return cached
+        found = {token} & self.vocab
+        if len(token) >= FUZZY_MIN_LEN - 1:
+            for variant in _deletions(token):
+                for name_token in self.fuzzy.get(variant, ()):
+                    if name_token not in found and _within_one_edit(token, name_token):
+                        found.add(name_token)
+        self._seen[token] = found
+        return found
+
+    def match(self, title):
+        """
+        Return [(group, name)] for the names found in a title, left to right.
+        Overlapping names resolve to the longest ("Polar’s Father", not "Polar").
+        """
+        tokens = normalize(title)
+        candidates = [self._candidates(t) for t in tokens]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            best = None
+            for first in candidates[i]:
+                for name_tokens, group, name in self.by_first.get(first, ()):
+                    n = len(name_tokens)
+                    if best and n <= len(best[0]):
+                        break
+                    if n == 1 and first != tokens[i]:
+                        continue  # No typos in single-word names
+                    if i + n <= len(tokens) and all(name_tokens[j] in candidates[i + j] for j in range(1, n)):
+                        best = (name_tokens, group, name)
+                        break
+            if best:
+                matches.append((best[1], best[2]))
+                i += len(best[0])
+            else:
+                i += 1
+        return matches
+
+    def route(self, titles):
+        """
+        Match many titles at once.
+
+        Args:
+            titles: { item_id: title }
+        Returns { group: set(item_ids) } for groups with at least one match.
+        """
+        routed = {}
+        for item_id, title in titles.items():
+            for group, _ in self.match(title):
+                routed.setdefault(group, set()).add(item_id)
+        return routed
+
+
+def build_index(subcollections=None):
+    """Build a TitleIndex from config.SUBCOLLECTIONS (or the given dict of the same shape)."""
+    subcollections = config.SUBCOLLECTIONS if subcollections is None else subcollections
+    names_by_group = {}
+    for name, sub in subcollections.items():
+        path = sub["names_file"]
+        if not os.path.isabs(path):
+            path = os.path.join(config.BASE_DIR, path)
+        try:
+            names_by_group[name] = load_names(path, sub.get("names_key"))
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️ Can't read name list for {name}: {e}")
+    return TitleIndex(names_by_group)
+
+
+def route_stored_items(conn, subcollections=None, index=None):
+    """
+    Route every titled item in the item store.
+    Items are only considered for a sub-collection if they carry one of its `tags`
+    (when given). Returns { sub-collection name: set(item_ids) }.
+    """
+    import item_store
+
+    subcollections = config.SUBCOLLECTIONS if subcollections is None else subcollections
+    index = index or build_index(subcollections)
+    titles = item_store.titles(conn)
+    routed = index.route({item_id: title for item_id, (title, _) in titles.items()})
+    for name, items in routed.items():
+        wanted = set(subcollections.get(name, {}).get("tags") or ())
+        if wanted:
+            routed[name] = {i for i in items if wanted & titles[i][1]}
+    return routed
+
+
+if __name__ == "__main__":
+    import time
+    import item_store
+
+    conn = item_store.connect()
+    start = time.perf_counter()
+    index = build_index()
+    routed = route_stored_items(conn, index=index)
+    elapsed = (time.perf_counter() - start) * 1000
+    for name in config.SUBCOLLECTIONS:
+        items = routed.get(name, set())
+        print(f"{name}: {len(items)} matching items")
+        for item_id, title in sorted((i, item_store.get_item(conn, i)["title"]) for i in items)[:20]:
+            print(f"  {item_id}  {title}  -> {', '.join(n for _, n in index.match(title))}")
+    print(f"Routed in {elapsed:.1f} ms")
@@ -0,0 +1,945 @@
+"""
+The browser side of auto_update_all.py: scrape collections and the workshop,
+add new items, verify and order them, and the watch and worker loops around
+that. Kept out of auto_update_all.py so `status` and `enqueue` start without
+importing Playwright.
+"""
+
+import os
+import sys
+import time
+import random
+import subprocess
+
+import config
+import collection_state
+import item_store
+import pacing
+import work_queue
+from collection_state import (
+    activate_app,
+    load_cache,
+    save_cache,
+    get_all_cached_items_for_tag,
+    lock_collection,
+    is_collection_locked,
+    load_failed_items,
+    save_failed_items,
+    load_add_journal,
+    save_add_journal,
+    clear_add_journal,
+)
+from steam_collection_bot import (
+    provision_collection,
+    get_collection_items,
+    get_collection_members,
+    get_workshop_items,
+    get_workshop_page,
+    add_to_collection,
+    is_item_in_collection,
+    set_collection_order,
+)
+from browser_session import BrowserSession
+from http_cache import ResponseCache
+from item_registry import ItemRegistry
+from session_pool import SessionPool
+from title_router import build_index, route_stored_items
+from watch_schedule import TagSchedule
+
+# How often to save cache (every N successful adds)
+SAVE_INTERVAL = 5
+
+
+def find_next_available_collection(tag, collections, cache, live_counts):
+    """Find first unlocked collection with remaining capacity.
+    
+    Uses live_counts (from Steam scrape) when available, falls back to cache.
+    This prevents overfilling when Steam has more items than our cache.
+    """
+    for col_id in collections:
+        if is_collection_locked(col_id):
+            continue
+        # Use live count if available (more accurate), otherwise use cache
+        actual_count = live_counts.get(col_id) if col_id in live_counts else len(cache.get(tag, {}).get(col_id, set()))
+        if actual_count < config.MAX_COLLECTION_ITEMS:
+            return col_id
+    return None
+
+
+def remaining_capacity(tag, collections, cache, live_counts):
+    """Total free slots across all unlocked collections for a tag."""
+    total = 0
+    for col_id in collections:
+        if is_collection_locked(col_id):
+            continue
+        actual_count = live_counts.get(col_id) if col_id in live_counts else len(cache.get(tag, {}).get(col_id, set()))
+        total += max(0, config.MAX_COLLECTION_ITEMS - actual_count)
+    return total
+
+
+def ensure_capacity(page, tag, collections, cache, live_counts, pending):
+    """Create new collections until free space covers `pending` items plus PROVISION_THRESHOLD.
+    
+    New collections are appended to `collections` (the config.COLLECTION_IDS list)
+    and recorded in the config overlay file, so the add loop can switch to them
+    instead of stopping at the capacity boundary.
+    """
+    if not config.AUTO_PROVISION:
+        return
+    while remaining_capacity(tag, collections, cache, live_counts) - pending < config.PROVISION_THRESHOLD:
+        col_id = provision_collection(page, tag)
+        if not col_id:
+            break
+        live_counts[col_id] = 0
+        cache.setdefault(tag, {})[col_id] = set()
+
+
+def commit_and_push(added_by_collection, paths=None):
+    """Commit cache/lock changes to git and push, with a per-collection summary message.
+    
+    With `paths` (workers), only those files are staged and committed, and
+    workers on this machine take turns so they don't collide on git's index lock.
+    """
+    if paths is None:
+        _commit_and_push(added_by_collection)
+        return
+    paths = [p for p in paths if os.path.exists(p)]
+    if paths:
+        with work_queue.git_lock():
+            _commit_and_push(added_by_collection, paths)
+
+
+def _commit_and_push(added_by_collection, paths=None):
+    try:
+        subprocess.run(["git", "add", "-A"] + (["--"] + paths if paths else []), check=True)
+        
+        parts = [f"{k}+{v}" for k, v in added_by_collection.items() if v > 0]
+        if parts:
+            msg = "update: " + " ".join(parts)
+            subprocess.run(["git", "commit", "-m", msg] + (["--"] + paths if paths else []), check=True)
+            subprocess.run(["git", "push"], check=True)
+            print(f"Git: committed and pushed ({msg})")
+    except subprocess.CalledProcessError as e:
+        print(f"Git error: {e}")
+
+
+def record_added(tag, col_id, item_id, cache, live_counts, run, journal=None):
+    """Book-keeping for one successful add: cache, live count, run counters and journal."""
+    cache.setdefault(tag, {}).setdefault(col_id, set())
+    cache[tag][col_id].add(item_id)
+    run["total_added"] += 1
+    run["unsaved_count"] += 1
+    
+    # Update live_counts to track actual capacity (increment by 1)
+    live_counts[col_id] = live_counts.get(col_id, len(cache[tag][col_id]) - 1) + 1
+    
+    # Track for commit message
+    key = f"{tag}:{col_id}"
+    run["added_by_collection"][key] = run["added_by_collection"].get(key, 0) + 1
+    
+    if journal is not None:
+        journal["added"].setdefault(col_id, []).append(item_id)
+        journal["live_counts"] = live_counts
+
+
+def save_tag_cache(tag, cache, journal):
+    """Save only the caches a tag's run touched (its own and cross-added tags'); other workers may own the rest."""
+    tags = {tag} | set(journal.get("cross_added", {}))
+    save_cache({t: cache[t] for t in tags if t in cache})
+
+
+def book_cross_adds(registry, cache, run, journal=None):
+    """Book adds to other tags' collections made in the same dialog (see ItemRegistry).
+    
+    They are journaled under journal["cross_added"] so they get verified and
+    reordered with this tag's adds, and survive an interrupted run.
+    """
+    if registry is None:
+        return
+    for item_id, other_tag, col_id in registry.pop_cross_adds():
+        # That tag's live counts are rebuilt when it is processed; only the cache matters here
+        record_added(other_tag, col_id, item_id, cache, {}, run)
+        if journal is not None:
+            journal.setdefault("cross_added", {}).setdefault(other_tag, {}).setdefault(col_id, []).append(item_id)
+        print(f"    + also added to {other_tag} collection {col_id}")
+
+
+def resume_from_journal(page, tag, journal, cache, run):
+    """Restore state from an interrupted run's add journal.
+    
+    Items the journal recorded as added are merged back into the cache (the crash
+    may have happened before the cache was saved), and the item that was in
+    flight (several with a session pool) is checked against its collection so it
+    is neither lost nor counted twice.
+    """
+    
+    for col_id, items in journal["added"].items():
+        cache.setdefault(tag, {}).setdefault(col_id, set()).update(items)
+    for other_tag, added in journal.get("cross_added", {}).items():
+        for col_id, items in added.items():
+            cache.setdefault(other_tag, {}).setdefault(col_id, set()).update(items)
+    
+    for item_id, col_id in (journal.get("in_flight") or {}).items():
+        if item_id not in journal["pending"]:
+            continue
+        print(f"  Checking interrupted add of {item_id}...", end=" ")
+        if is_item_in_collection(page, item_id, col_id):
+            print("already added")
+            journal["pending"].remove(item_id)
+            record_added(tag, col_id, item_id, cache, journal["live_counts"], run, journal)
+        else:
+            print("not added, will retry")
+    journal["in_flight"] = {}
+    save_add_journal(tag, journal)
+
+
+def reorder_collections(page, tag, col_ids, cache, store):
+    """Set each collection's display order to newest first (by publish time from the item store)."""
+    
+    for col_id in col_ids:
+        items = cache.get(tag, {}).get(col_id)
+        if not items:
+            continue
+        ordered = item_store.sort_newest_first(store, items)
+        if set_collection_order(page, col_id, ordered):
+            print(f"  Ordered collection {col_id} newest first ({len(ordered)} items)")
+
+
+def verify_adds(page, tag, added, cache, live_counts, run):
+    """Check that this run's adds actually landed, rescraping a collection only on a mismatch.
+    
+    For each collection in `added` ({ col_id: [item IDs in add order] }), the
+    collection's member list is fetched from the Web API and every add is checked
+    against it. The API can lag right after adding, so each add it doesn't list is
+    confirmed in the item's collection dialog; the cache is then replaced with the
+    members plus the adds that turned out to be there. If the API is unavailable, the last
+    VERIFY_RECENT items plus VERIFY_SAMPLE_SIZE random ones are looked up in each
+    item's collection dialog instead, and the collection is scraped in full only
+    if any is missing. Lost adds are taken off the run's counters; they show up
+    as new again on the next crawl.
+    
+    Returns the number of adds that turned out not to have landed.
+    """
+    
+    total_lost = 0
+    for col_id, items in added.items():
+        if not items:
+            continue
+        members = get_collection_members(col_id)
+        if members is not None:
+            unlisted = set(items) - members
+            # Not being listed yet isn't proof; only a dialog saying "not in it" is
+            lost = {i for i in unlisted if is_item_in_collection(page, i, col_id) is False}
+            live_items = members | (unlisted - lost)
+            if not lost:
+                print(f"  Verified all {len(items)} adds to collection {col_id}")
+        else:
+            sample = set(items[-config.VERIFY_RECENT:])
+            sample.update(random.sample(items, min(config.VERIFY_SAMPLE_SIZE, len(items))))
+            missing = {i for i in sample if is_item_in_collection(page, i, col_id) is False}
+            if not missing:
+                print(f"  Verified {len(sample)} of {len(items)} adds to collection {col_id}")
+                continue
+            print(f"  ⚠️ {len(missing)} of {len(sample)} sampled adds not in collection {col_id}, rescraping it...")
+            live_items = get_collection_items(page, col_id)
+            if live_items is None:
+                print(f"  Collection {col_id}: rescrape failed, keeping cache")
+                continue
+            lost = set(items) - live_items
+        
+        cache.setdefault(tag, {})[col_id] = set(live_items)
+        if not is_collection_locked(col_id):
+            live_counts[col_id] = len(live_items)
+        run["unsaved_count"] += 1  # Cache replaced; make sure it gets saved
+        if not lost:
+            continue
+        total_lost += len(lost)
+        run["total_added"] -= len(lost)
+        key = f"{tag}:{col_id}"
+        run["added_by_collection"][key] = run["added_by_collection"].get(key, 0) - len(lost)
+        if run["added_by_collection"][key] <= 0:
+            del run["added_by_collection"][key]
+        print(f"  Collection {col_id}: {len(live_items)} items on Steam, "
+              f"{len(lost)} of this run's adds didn't land (they will be picked up again next run)")
+    return total_lost
+
+
+def plan_targets(tag, items, collections, cache, live_counts):
+    """Assign items to unlocked collections in fill order, up to each one's free space.
+    
+    Pass items oldest first, so older items go to the earlier collection.
+    
+    Returns a list of (item_id, col_id); items beyond the total free space are left out.
+    """
+    assignments = []
+    remaining_items = list(items)
+    for col_id in collections:
+        if not remaining_items:
+            break
+        if is_collection_locked(col_id):
+            continue
+        count = live_counts.get(col_id) if col_id in live_counts else len(cache.get(tag, {}).get(col_id, set()))
+        free = max(0, config.MAX_COLLECTION_ITEMS - count)
+        assignments.extend((item_id, col_id) for item_id in remaining_items[:free])
+        remaining_items = remaining_items[free:]
+    return assignments
+
+
+def add_with_pool(pool, page, tag, collections, cache, live_counts, run, journal, registry=None,
+                  check_stop=None):
+    """Drain the journal's pending queue through a session pool.
+    
+    Targets are planned up front so workers never race for the last slots of a
+    collection. At most pool.size jobs are outstanding, and they are recorded as
+    in flight in the journal so a crash only needs to re-check those.
+    Failed items go to journal["failed"]. Returns the number of items added.
+    
+    check_stop (optional) is called before each submit; if it raises, no more
+    items are submitted, the outstanding ones are waited for and the error is re-raised.
+    """
+    pending = journal["pending"]
+    ensure_capacity(page, tag, collections, cache, live_counts, len(pending))
+    assignments = plan_targets(tag, pending, collections, cache, live_counts)
+    if len(assignments) < len(pending):
+        print(f"  ⚠️ Only room for {len(assignments)} of {len(pending)} items in {tag} collections")
+    
+    print(f"\n  Adding {len(assignments)} items with {pool.size} parallel sessions...")
+    added_count = 0
+    done = 0
+    outstanding = journal["in_flight"]
+    stopped = None
+    while assignments or outstanding:
+        if assignments and check_stop is not None:
+            try:
+                check_stop()
+            except Exception as e:
+                print(f"  ⏹ Stopping: {e}; waiting for {len(outstanding)} add(s) in flight")
+                stopped = e
+                assignments = []
+        while assignments and len(outstanding) < pool.size:
+            item_id, col_id = assignments.pop(0)
+            outstanding[item_id] = col_id
+            pool.submit(item_id, col_id)
+        if not outstanding:
+            break
+        if stopped is None:
+            save_add_journal(tag, journal)
+        
+        item_id, col_id, success = pool.get_result()
+        done += 1
+        del outstanding[item_id]
+        pending.remove(item_id)
+        if success:
+            added_count += 1
+            record_added(tag, col_id, item_id, cache, live_counts, run, journal)
+            print(f"  [{done}] {item_id} ✓ → {col_id} ({live_counts[col_id]}/{config.MAX_COLLECTION_ITEMS})")
+            if live_counts[col_id] >= config.MAX_COLLECTION_ITEMS:
+                lock_collection(col_id)
+            if run["unsaved_count"] >= SAVE_INTERVAL and stopped is None:
+                save_tag_cache(tag, cache, journal)
+                run["unsaved_count"] = 0
+        else:
+            print(f"  [{done}] {item_id} ✗ Failed")
+            journal["failed"].append(item_id)
+        book_cross_adds(registry, cache, run, journal)
+        if stopped is None:
+            save_add_journal(tag, journal)
+    if stopped is not None:
+        raise stopped
+    return added_count
+
+
+def process_tag(page, tag, collections, cache, run, store, http_cache, pool=None, registry=None,
+                watchdog=None, full_scrape=False, debug=False, check_stop=None):
+    """Scrape a tag's collections and workshop listing, then add the new items.
+    
+    `run` holds the per-run counters shared across tags:
+    {"total_added": int, "unsaved_count": int, "added_by_collection": {"tag:col": int}}
+    
+    The add queue is journaled (see collection_state.save_add_journal) after every
+    item, so an interrupted run resumes here without re-scraping or re-crawling.
+    With a session pool, adds run in parallel on the pool's workers; otherwise
+    they run one by one on `page`. The run's ItemRegistry (if given) skips items
+    another tag found dead and lets one visit add an item to all its tags' collections.
+    The watchdog (a BrowserSession, if given) is told the outcome of every request
+    on `page` and restarts the browser in place if it stops responding.
+    check_stop (e.g. a work queue LeaseKeeper's check) is called before every add
+    and aborts the run by raising.
+    
+    Collection membership comes from the cache, which verify_adds keeps honest
+    after every batch of adds; collections are only scraped in full when they
+    aren't cached yet or with full_scrape (e.g. after removing items by hand).
+    
+    Returns the number of items added.
+    """
+    
+    print(f"\n{'='*40}")
+    print(f"Processing: {tag}")
+    print(f"Collections: {collections}")
+    print(f"{'='*40}")
+    
+    # Items found this time but left out for lack of room; watch() doesn't count them as new again
+    unplaced = run.setdefault("unplaced", {})
+    unplaced[tag] = set()
+    
+    journal = load_add_journal(tag)
+    if journal:
+        print(f"  Resuming interrupted run: {len(journal['pending'])} pending, "
+              f"{len(journal['failed'])} to retry, target {journal['target_col']}")
+        resume_from_journal(page, tag, journal, cache, run)
+        live_counts = journal["live_counts"]
+    else:
+        # Item counts of the unlocked collections, updated as we add
+        live_counts = {}
+        # Items in this tag's collections - these are what's "known" to the workshop crawl
+        items_actually_in_collections = set()
+        scraped = False
+        
+        for col_id in collections:
+            cached_items = cache.get(tag, {}).get(col_id)
+            if cached_items is not None and not full_scrape:
+                # Adds are verified after every batch, so the cache can be trusted here
+                items_actually_in_collections.update(cached_items)
+                if not is_collection_locked(col_id):
+                    live_counts[col_id] = len(cached_items)
+                    if len(cached_items) >= config.MAX_COLLECTION_ITEMS:
+                        lock_collection(col_id)
+                continue
+            
+            # Not cached yet (or --full-scrape): scrape it to know what's actually in it.
+            # A full scrape also catches items that were removed by hand.
+            # Locked collections only change if edited by hand, so a cached copy is good for longer
+            ttl = config.HTTP_CACHE_LOCKED_TTL if is_collection_locked(col_id) else None
+            with http_cache.serve(page, ttl=ttl):
+                live_items = get_collection_items(page, col_id)
+            if watchdog is not None:
+                watchdog.note_result(live_items is not None)
+            
+            if live_items is None:
+                # Scrape failed - fall back to cache for this collection only
+                print(f"  Collection {col_id}: scrape failed, using cache as fallback")
+                cached_items = cache.get(tag, {}).get(col_id, set())
+                items_actually_in_collections.update(cached_items)
+                if not is_collection_locked(col_id):
+                    live_counts[col_id] = len(cached_items)
+                continue
+            
+            print(f"  Collection {col_id}: {len(live_items)} items on Steam", end="")
+            if is_collection_locked(col_id):
+                print(" (LOCKED)")
+            else:
+                print("")
+                live_counts[col_id] = len(live_items)
+            
+            # Track what's ACTUALLY in this collection
+            items_actually_in_collections.update(live_items)
+            
+            # Update cache to match reality (REPLACE, don't just merge)
+            # This fixes the issue where cache has items that were manually removed
+            cache.setdefault(tag, {})[col_id] = live_items.copy()
+            scraped = True
+            
+            # Check if collection is at/over limit - LOCK IT
+            if len(live_items) >= config.MAX_COLLECTION_ITEMS and not is_collection_locked(col_id):
+                lock_collection(col_id)
+        
+        print(f"  Total items in all {tag} collections: {len(items_actually_in_collections)}")
+        
+        # Scrape workshop for items NOT in any collection (use live data, not cache!)
+        print(f"\n  Scraping workshop for new {tag}...")
+        with http_cache.serve(page):
+            new_items = get_workshop_items(page, tag, items_actually_in_collections, store=store)
+        
+        if registry is not None:
+            new_items = registry.filter_new(new_items)
+        
+        if not new_items:
+            print(f"  No new items to add for {tag}")
+            return 0
+        
+        # Oldest first on both paths: collections fill in chronological order, and
+        # one-by-one adds end up newest on top even if the reorder is off or fails
+        new_items = list(reversed(new_items))
+        print(f"  Found {len(new_items)} items to add (oldest first)")
+        
+        # Make sure the backlog won't stall at the capacity boundary
+        ensure_capacity(page, tag, collections, cache, live_counts, len(new_items))
+        
+        # Find first unlocked collection with capacity
+        # Use live_counts for accurate capacity check
+        target_col = find_next_available_collection(tag, collections, cache, live_counts)
+        
+        if not target_col:
+            print(f"  ⚠️ All collections for {tag} are locked/full!")
+            unplaced[tag].update(new_items)
+            return 0
+        
+        journal = {
+            "target_col": target_col,
+            "pending": new_items,
+            "failed": [],
+            "added": {},
+            "live_counts": live_counts,
+            "in_flight": {},
+        }
+        if scraped:
+            # A resumed run rebuilds the cache from disk plus the journal's adds,
+            # so what was just scraped has to be on disk before the first add
+            save_tag_cache(tag, cache, journal)
+        save_add_journal(tag, journal)
+    
+    pending = journal["pending"]
+    failed_items = journal["failed"]  # Track items that fail to add
+    target_col = journal["target_col"]
+    added_count = 0
+    
+    if pending and pool is None:
+        print(f"\n  Adding {len(pending)} items to collection {target_col}...")
+    
+    if pool is not None and pending:
+        added_count += add_with_pool(pool, page, tag, collections, cache, live_counts, run, journal, registry,
+                                     check_stop=check_stop)
+        target_col = find_next_available_collection(tag, collections, cache, live_counts)
+    
+    # Add items one by one; the journal always holds exactly what is left to do
+    total = len(pending)
+    idx = 0
+    while pending:
+        if check_stop is not None:
+            check_stop()
+        idx += 1
+        item_id = pending[0]
+        # Check if current target is full, switch if needed
+        # Use live_counts if available, updated as we add items
+        current_count = live_counts.get(target_col, len(cache.get(tag, {}).get(target_col, set())))
+        if target_col and current_count >= config.MAX_COLLECTION_ITEMS:
+            # This collection is now full, lock it and find next
+            lock_collection(target_col)
+            target_col = None
+        if not target_col:
+            target_col = find_next_available_collection(tag, collections, cache, live_counts)
+            if not target_col:
+                ensure_capacity(page, tag, collections, cache, live_counts, len(pending))
+                target_col = find_next_available_collection(tag, collections, cache, live_counts)
+            
+            if not target_col:
+                print(f"  ⚠️ All collections full for {tag}, stopping")
+                break
+            
+            print(f"  Switching to collection {target_col}")
+            journal["target_col"] = target_col
+        
+        # Try to add the item
+        journal["in_flight"] = {item_id: target_col}
+        save_add_journal(tag, journal)
+        print(f"  [{idx}/{total}] Adding {item_id}...", end=" ")
+        success = add_to_collection(page, item_id, target_col, debug=debug, store=store, registry=registry, tag=tag)
+        if watchdog is not None:
+            watchdog.note_result(success)
+        pending.pop(0)
+        journal["in_flight"] = {}
+        
+        if success:
+            added_count += 1
+            record_added(tag, target_col, item_id, cache, live_counts, run, journal)
+            
+            actual_count = live_counts[target_col]
+            remaining = config.MAX_COLLECTION_ITEMS - actual_count
+            print(f"✓ ({actual_count}/{config.MAX_COLLECTION_ITEMS}, {remaining} left)")
+            
+            # Check if we just filled it - lock and switch immediately
+            if actual_count >= config.MAX_COLLECTION_ITEMS:
+                lock_collection(target_col)
+                target_col = find_next_available_collection(tag, collections, cache, live_counts)
+                if not target_col and pending:
+                    ensure_capacity(page, tag, collections, cache, live_counts, len(pending))
+                    target_col = find_next_available_collection(tag, collections, cache, live_counts)
+                if target_col:
+                    print(f"  Switching to collection {target_col}")
+                    journal["target_col"] = target_col
+                elif pending:
+                    print(f"  ⚠️ All collections full for {tag}, stopping")
+                    break
+            
+            # Periodic save to protect against crashes
+            if run["unsaved_count"] >= SAVE_INTERVAL:
+                save_tag_cache(tag, cache, journal)
+                run["unsaved_count"] = 0
+                print(f"  [Cache saved]")
+        else:
+            print(f"✗ Failed")
+            failed_items.append(item_id)
+        book_cross_adds(registry, cache, run, journal)
+        save_add_journal(tag, journal)
+    
+    # Retry failed items once more at the end
+    if failed_items and target_col:
+        print(f"\n  Retrying {len(failed_items)} failed items...")
+        still_failed = []
+        while failed_items:
+            if check_stop is not None:
+                check_stop()
+            item_id = failed_items.pop(0)
+            if registry is not None and registry.is_dead(item_id):
+                continue  # Deleted on Steam; retrying can't help
+            print(f"  [Retry] Adding {item_id}...", end=" ")
+            success = add_to_collection(page, item_id, target_col, debug=debug, store=store, registry=registry, tag=tag)
+            if watchdog is not None:
+                watchdog.note_result(success)
+            if success:
+                added_count += 1
+                record_added(tag, target_col, item_id, cache, live_counts, run, journal)
+                print(f"✓")
+            else:
+                print(f"✗ Failed again")
+                still_failed.append(item_id)
+                save_failed_items(tag, [item_id])
+            book_cross_adds(registry, cache, run, journal)
+            save_add_journal(tag, journal)
+        
+        # Persistently failed items were saved for manual review
+        if still_failed:
+            print(f"\n  ⚠️  {len(still_failed)} items persistently failed, saved to failed_items.json")
+            print(f"      Manual review needed for: {', '.join(still_failed[:3])}{'...' if len(still_failed) > 3 else ''}")
+    elif failed_items:
+        # No collection left to retry into
+        save_failed_items(tag, failed_items)
+    
+    # Whatever is still pending had nowhere to go
+    unplaced[tag].update(pending)
+    
+    # Confirm the adds landed before anything relies on the cache
+    added_count -= verify_adds(page, tag, journal["added"], cache, live_counts, run)
+    # Adds made to other tags' collections in the same dialogs get the same check
+    for other_tag, added in journal.get("cross_added", {}).items():
+        verify_adds(page, other_tag, added, cache, {}, run)
+    
+    # One request per touched collection puts the newest items on top
+    if config.REORDER_AFTER_ADD:
+        reorder_collections(page, tag, list(journal["added"]), cache, store)
+        for other_tag, added in journal.get("cross_added", {}).items():
+            reorder_collections(page, other_tag, list(added), cache, store)
+    
+    # Queue drained (or nothing left we can do): the next run starts with fresh discovery
+    clear_add_journal(tag)
+    
+    # Collections we added to have changed; don't serve their pages from cache next time
+    for key in run["added_by_collection"]:
+        if key.startswith(f"{tag}:"):
+            http_cache.invalidate(f"{config.SHARED_FILE_DETAILS_URL}{key.split(':', 1)[1]}")
+    
+    print(f"  {tag}: added {added_count} items")
+    return added_count
+
+
+def route_subcollections(page, cache, run, store, watchdog=None, debug=False):
+    """Add items whose titles match a sub-collection's name list (config.SUBCOLLECTIONS).
+    
+    Titles come from the item store, so routing needs no extra Steam requests;
+    only the adds themselves do. Sub-collections are cached under their own
+    name like a tag and filled in order, but never provisioned automatically.
+    
+    Returns the number of items added.
+    """
+    
+    # The name lists are about the default game
+    if config.APP_ID != config.DEFAULT_APP_ID:
+        return 0
+    active = {name: sub for name, sub in config.SUBCOLLECTIONS.items() if sub.get("collection_ids")}
+    if not active:
+        return 0
+    routed = route_stored_items(store, active, index=build_index(active))
+    
+    failed = load_failed_items()
+    added_count = 0
+    for name, sub in active.items():
+        collections = sub["collection_ids"]
+        # Items that failed before are left for manual review, like a tag's failed items
+        new_items = sorted(routed.get(name, set()) - get_all_cached_items_for_tag(cache, name)
+                           - set(failed.get(name, [])))
+        if not new_items:
+            continue
+        print(f"\n  {name}: {len(new_items)} matching items to add")
+        live_counts = {}
+        added = {}
+        for idx, item_id in enumerate(new_items, 1):
+            target_col = find_next_available_collection(name, collections, cache, live_counts)
+            if not target_col:
+                print(f"  ⚠️ All {name} collections are full, stopping")
+                break
+            print(f"  [{idx}/{len(new_items)}] Adding {item_id} to {target_col}...", end=" ")
+            success = add_to_collection(page, item_id, target_col, debug=debug, store=store)
+            if watchdog is not None:
+                watchdog.note_result(success)
+            if not success:
+                print("✗ Failed")
+                save_failed_items(name, [item_id])
+                continue
+            added_count += 1
+            record_added(name, target_col, item_id, cache, live_counts, run)
+            added.setdefault(target_col, []).append(item_id)
+            print("✓")
+            if live_counts[target_col] >= config.MAX_COLLECTION_ITEMS:
+                lock_collection(target_col)
+        added_count -= verify_adds(page, name, added, cache, live_counts, run)
+        if config.REORDER_AFTER_ADD:
+            reorder_collections(page, name, list(added), cache, store)
+    return added_count
+
+
+def watch(page, cache, run, store, http_cache, pool=None, registry=None, watchdog=None, debug=False):
+    """Keep the session alive and poll page 1 of each tag on its own adaptive interval.
+    
+    The full add pipeline for a tag only runs when its first workshop page shows
+    an item we don't know yet. Changes are saved and committed after each such run.
+    Stops on Ctrl+C.
+    """
+    
+    tags = list(config.COLLECTION_IDS)
+    schedule = TagSchedule(tags, initial_rates={tag: item_store.upload_rate(store, tag) for tag in tags})
+    for tag in tags:
+        schedule.mark_polled(tag)  # The full pass just ran; start from the estimated intervals
+    
+    print(f"\n👀 Watching {len(tags)} tags (Ctrl+C to stop)")
+    while True:
+        due = schedule.due()
+        if not due:
+            time.sleep(min(schedule.seconds_until_next(), 60))
+            continue
+        
+        for tag in due:
+            known = (get_all_cached_items_for_tag(cache, tag) | set(load_failed_items().get(tag, []))
+                     | run.get("unplaced", {}).get(tag, set()))
+            # ttl=0: always revalidate, but a 304 still saves the download
+            with http_cache.serve(page, ttl=0):
+                page_ids = get_workshop_page(page, tag, 1, store=store)
+            if watchdog is not None:
+                watchdog.note_result(page_ids is not None)
+            if page_ids is None:
+                schedule.record_failure(tag)
+                continue
+            
+            # Dead items and items with nowhere to go would look new on every poll
+            new_ids = [i for i in page_ids
+                       if i not in known and not (registry is not None and registry.is_dead(i))]
+            schedule.record_poll(tag, len(new_ids))
+            stamp = time.strftime("%H:%M:%S")
+            if not new_ids:
+                print(f"[{stamp}] {tag}: nothing new (next check in {schedule.interval(tag) / 60:.0f} min)")
+                continue
+            
+            print(f"[{stamp}] {tag}: {len(new_ids)} new on page 1")
+            added_before = run["total_added"]
+            process_tag(page, tag, config.COLLECTION_IDS[tag], cache, run, store, http_cache,
+                        pool=pool, registry=registry, watchdog=watchdog, debug=debug)
+            route_subcollections(page, cache, run, store, watchdog=watchdog, debug=debug)
+            if run["total_added"] > added_before:
+                save_cache(cache)
+                commit_and_push(run["added_by_collection"])
+                run["unsaved_count"] = 0
+                run["added_by_collection"] = {}
+            print(f"  Next {tag} check in {schedule.interval(tag) / 60:.0f} min")
+
+
+def run_worker(args):
+    """Claim (app, tag) jobs from the shared work queue and run the add pipeline for each, until it is empty.
+    
+    Several workers (processes or machines sharing the queue file) can run at
+    once. Each job only loads, saves and commits its own tag's cache files, and
+    items aren't cross-added to other tags, since another worker may own those.
+    Workers start their browsers from the exported storage state, so they never
+    share a profile directory, and stop adding as soon as their lease is lost.
+    """
+    
+    owner = f"{work_queue.worker_name()}:{args.worker}"
+    print("=" * 60)
+    print(f"Steam Collection Worker {owner}")
+    print("=" * 60)
+    
+    # Two browsers can't share one persistent profile directory
+    if not os.path.exists(config.STORAGE_STATE_PATH):
+        print(f"\n⚠️  Workers need an exported Steam session ({os.path.basename(config.STORAGE_STATE_PATH)}).")
+        print("   Export it once with: python login_steam.py --export-state")
+        sys.exit(1)
+    
+    queue_conn = work_queue.connect()
+    store = item_store.connect()
+    # Own page cache per worker name: workers rewriting one index would lose each other's entries
+    http_cache = ResponseCache(os.path.join(config.HTTP_CACHE_DIR, f"worker-{args.worker}"))
+    session = BrowserSession(headless=not args.headful, session_mode="storage_state")
+    if not session.is_logged_in:
+        print("\n⚠️  Not logged into Steam. Log in once with: python auto_update_all.py --login")
+        session.close()
+        sys.exit(1)
+    page = session.page
+    
+    pool = None
+    if args.workers > 1:
+        pool = SessionPool(session.context.storage_state(), args.workers, headless=not args.headful,
+                           debug=args.debug)
+    
+    jobs_done = 0
+    total_added = 0
+    try:
+        while True:
+            job = work_queue.claim(queue_conn, owner)
+            if job is None:
+                print("\n✅ Work queue is empty")
+                break
+            app_id, tag = job
+            run = {"total_added": 0, "unsaved_count": 0, "added_by_collection": {}}
+            cache = None
+            lost = False
+            try:
+                with work_queue.LeaseKeeper(app_id, tag, owner) as lease:
+                    activate_app(app_id)
+                    print(f"\n📋 Job: {config.APPS[app_id]['name']} / {tag}")
+                    if tag not in config.COLLECTION_IDS:
+                        raise ValueError(f"Tag {tag} is not configured for app {app_id}")
+                    cache = load_cache()
+                    process_tag(page, tag, config.COLLECTION_IDS[tag], cache, run, store, http_cache,
+                                pool=pool, watchdog=session, full_scrape=args.full_scrape, debug=args.debug,
+                                check_stop=lease.check)
+            except KeyboardInterrupt:
+                work_queue.release(queue_conn, app_id, tag, owner)
+                raise
+            except work_queue.LeaseLost:
+                # The job (and its files) belong to another worker now; leave both alone
+                print(f"  ⚠️ Lease on {app_id}/{tag} expired while running; stopped, another worker is redoing it")
+                lost = True
+            except Exception as e:
+                print(f"  ❌ Job {app_id}/{tag} failed: {str(e)[:100]}")
+                work_queue.fail(queue_conn, app_id, tag, owner, e)
+            else:
+                if lease.lost or not work_queue.complete(queue_conn, app_id, tag, owner):
+                    print(f"  ⚠️ Lease on {app_id}/{tag} expired while running; another worker may redo it")
+                jobs_done += 1
+            finally:
+                if cache is not None and not lost and (run["total_added"] > 0 or run["unsaved_count"] > 0):
+                    # Only this tag's files: other workers may be saving the app's other tags
+                    save_cache({tag: cache.get(tag, {})})
+                    commit_and_push(run["added_by_collection"], paths=[
+                        os.path.join(collection_state.CACHE_DIR, tag), config.COLLECTION_OVERLAY_FILE,
+                        collection_state.LOCKED_FILE, collection_state.FAILED_FILE])
+                total_added += run["total_added"]
+    
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user (job handed back to the queue)")
+    
+    finally:
+        if pool is not None:
+            pool.close()
+        session.close()
+        store.close()
+        queue_conn.close()
+    
+    print(f"\n{'='*60}")
+    print(f"Done! {jobs_done} job(s), total added: {total_added}")
+    print(f"Steam pacing: {pacing.pacer.summary()}")
+    print(f"{'='*60}")
+
+
+def run_update(args):
+    """Scrape collections and the workshop, then add new items (needs Playwright)."""
+    
+    print("=" * 60)
+    print("Steam Collection Auto-Updater")
+    print("=" * 60)
+    
+    # Show usage hint
+    if not args.login and not args.headful:
+        print("\n💡 Tip: Use --login flag for first run or if not logged in:")
+        print("   python auto_update_all.py --login\n")
+    
+    cache = load_cache()
+    store = item_store.connect()
+    http_cache = ResponseCache()
+    
+    # Determine headless mode: --headful flag or --login implies non-headless
+    headless = not (args.headful or args.login)
+    
+    if args.login:
+        print("🔓 Opening browser in visible mode for login...")
+    elif args.headful:
+        print("👁️  Running in visible mode...")
+    else:
+        print("👻 Running in headless mode...")
+    
+    session = BrowserSession(headless=headless, prompt_login=args.login)
+    # Proxy to the current page: stays valid if the watchdog restarts the browser
+    page = session.page
+    
+    if not session.is_logged_in:
+        print("\n⚠️  WARNING: Not logged into Steam. Adding items to collections will fail.")
+        print("   Run with --login flag to login manually:")
+        print("   python auto_update_all.py --login")
+        if headless:
+            print("\n   Or run with --headful to see the browser:")
+            print("   python auto_update_all.py --headful")
+        response = input("\nContinue anyway? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Exiting...")
+            session.close()
+            sys.exit(0)
+    
+    # Shared across tags so multi-tag items are looked up once per run
+    registry = ItemRegistry(
+        cache,
+        target_for_tag=lambda t: find_next_available_collection(t, config.COLLECTION_IDS.get(t, []), cache, {}),
+    )
+    
+    pool = None
+    if args.workers > 1:
+        # Workers get their own contexts built from this session's cookies
+        print(f"Starting {args.workers} parallel browser sessions...")
+        pool = SessionPool(session.context.storage_state(), args.workers, headless=headless,
+                           registry=registry, debug=args.debug)
+    
+    run = {
+        "total_added": 0,
+        "unsaved_count": 0,  # Track adds since last save
+        "added_by_collection": {},  # For commit message
+    }
+    
+    try:
+        for tag, collections in config.COLLECTION_IDS.items():
+            process_tag(page, tag, collections, cache, run, store, http_cache,
+                        pool=pool, registry=registry, watchdog=session, full_scrape=args.full_scrape,
+                        debug=args.debug)
+        
+        route_subcollections(page, cache, run, store, watchdog=session, debug=args.debug)
+        
+        if args.watch:
+            if run["added_by_collection"]:
+                save_cache(cache)
+                commit_and_push(run["added_by_collection"])
+                run["unsaved_count"] = 0
+                run["added_by_collection"] = {}
+            watch(page, cache, run, store, http_cache, pool=pool, registry=registry, watchdog=session,
+                  debug=args.debug)
+    
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+    
+    finally:
+        if pool is not None:
+            pool.close()
+        session.close()
+        store.close()
+        
+        # Always save cache if anything was added (even on interrupt/error)
+        if run["total_added"] > 0 or run["unsaved_count"] > 0:
+            print(f"\nSaving cache...")
+            save_cache(cache)
+            commit_and_push(run["added_by_collection"])
+        else:
+            print("\nNo changes to save")
+    
+    print(f"\n{'='*60}")
+    print(f"Done! Total added: {run['total_added']}")
+    stats = http_cache.stats
+    print(f"Page cache: {stats['fresh']} fresh, {stats['revalidated']} revalidated, {stats['fetched']} fetched")
+    print(f"Steam pacing: {pacing.pacer.summary()}")
+    if session.relaunches:
+        print(f"Browser restarted {session.relaunches} time(s) after crashes/hangs")
+    print(f"{'='*60}")
@@ -0,0 +1,65 @@
+"""
+Per-tag polling schedule for watch mode.
+
+Each tag keeps an estimate of its upload rate (items per hour), seeded from
+the item store and updated after every poll of workshop page 1. The polling
+interval is chosen so that roughly WATCH_TARGET_NEW_PER_POLL new items are
+expected per poll, clamped to [WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL]:
+busy tags (Characters) are checked every few minutes, quiet ones (Wheels)
+about once an hour.
+"""
+
+import time
+import config
+
+
+class TagSchedule:
+    """Tracks upload-rate estimates and next poll times for a set of tags."""
+
+    def __init__(self, tags, initial_rates=None, now=None):
+        now = now if now is not None else time.time()
+        initial_rates = initial_rates or {}
+        self.rates = {tag: float(initial_rates.get(tag, 0.0)) for tag in tags}
+        self.last_poll = {tag: None for tag in tags}
+        # Poll everything once right away
+        self.next_poll = {tag: now for tag in tags}
+
+    def interval(self, tag):
+        """Seconds to wait between polls of a tag at its current estimated rate."""
+        rate = self.rates[tag]
+        if rate <= 0:
+            return config.WATCH_MAX_INTERVAL
+        seconds = config.WATCH_TARGET_NEW_PER_POLL / rate * 3600
+        return max(config.WATCH_MIN_INTERVAL, min(config.WATCH_MAX_INTERVAL, seconds))
+
+    def due(self, now=None):
+        """Tags whose next poll time has passed, most overdue first."""
+        now = now if now is not None else time.time()
+        return sorted((t for t, at in self.next_poll.items() if at <= now), key=self.next_poll.get)
+
+    def seconds_until_next(self, now=None):
+        now = now if now is not None else time.time()
+        return max(0.0, min(self.next_poll.values()) - now)
+
+    def record_poll(self, tag, new_count, now=None):
+        """Update a tag's rate estimate with the number of new items found, and reschedule it."""
+        now = now if now is not None else time.time()
+        last = self.last_poll[tag]
+        elapsed = (now - last) if last is not None else self.interval(tag)
+        if elapsed > 0:
+            observed = new_count / (elapsed / 3600)
+            alpha = config.WATCH_RATE_SMOOTHING
+            self.rates[tag] = alpha * observed + (1 - alpha) * self.rates[tag]
+        self.last_poll[tag] = now
+        self.next_poll[tag] = now + self.interval(tag)
+
+    def mark_polled(self, tag, now=None):
+        """Treat a tag as just checked (e.g. after a full pass) without changing its rate."""
+        now = now if now is not None else time.time()
+        self.last_poll[tag] = now
+        self.next_poll[tag] = now + self.interval(tag)
+
+    def record_failure(self, tag, now=None):
+        """Retry a tag after the minimum interval without touching its rate estimate."""
+        now = now if now is not None else time.time()
+        self.next_poll[tag] = now + config.WATCH_MIN_INTERVAL
@@ -0,0 +1,236 @@
+"""
+Local work queue of (app, tag) jobs for running several workers at once.
+
+The queue is a small SQLite file (config.WORK_QUEUE_PATH). Worker processes on
+this machine, or on other machines that share the file, claim one job at a
+time under a lease:
+
+- claim() hands out the oldest queued job, or one whose lease has expired
+  (its worker crashed or lost the network), inside a write transaction so two
+  workers never get the same job
+- while the job runs, a LeaseKeeper thread renews the lease every
+  WORK_HEARTBEAT_INTERVAL seconds
+- complete() marks it done; fail() puts it back in the queue, or parks it as
+  "failed" after WORK_MAX_ATTEMPTS tries
+- if a heartbeat finds the job was reclaimed, LeaseKeeper.check() raises
+  LeaseLost so the worker stops adding at once
+
+git_lock() makes workers on one machine take turns committing their results.
+
+Table:
+- jobs: one row per (app_id, tag) with state queued / leased / done / failed
+"""
+
+import os
+import time
+import socket
+import sqlite3
+import threading
+import config
+from collection_state import file_lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    app_id        TEXT NOT NULL,
+    tag           TEXT NOT NULL,
+    state         TEXT NOT NULL DEFAULT 'queued',
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    last_error    TEXT,
+    updated       REAL NOT NULL,
+    PRIMARY KEY (app_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, updated);
+"""
+
+STATE_QUEUED = "queued"
+STATE_LEASED = "leased"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+class LeaseLost(Exception):
+    """The job's lease ran out and another worker reclaimed it."""
+
+
+def connect(path=None):
+    """Open (and create if needed) the work queue. Returns a sqlite3 connection in autocommit mode."""
+    path = path or config.WORK_QUEUE_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Autocommit, so claim() can take the write lock up front with BEGIN IMMEDIATE
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def worker_name():
+    """Default owner name for this process: host and PID."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(conn, jobs, now=None):
+    """
+    Queue (app_id, tag) jobs. Finished or failed jobs are queued again;
+    jobs that are already queued or leased are left alone.
+    Returns the number of jobs (re)queued.
+    """
+    now = now if now is not None else time.time()
+    queued = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for app_id, tag in jobs:
+            cur = conn.execute(
+                """
+                INSERT INTO jobs (app_id, tag, state, updated) VALUES (?, ?, ?, ?)
+                ON CONFLICT(app_id, tag) DO UPDATE SET
+                    state = excluded.state, owner = NULL, lease_expires = NULL,
+                    attempts = 0, last_error = NULL, updated = excluded.updated
+                WHERE jobs.state IN (?, ?)
+                """,
+                (str(app_id), tag, STATE_QUEUED, now, STATE_DONE, STATE_FAILED))
+            queued += cur.rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return queued
+
+
+def enqueue_all(conn, apps=None, now=None):
+    """Queue one job per tag of every configured app (config.APPS)."""
+    apps = config.APPS if apps is None else apps
+    jobs = [(app_id, tag) for app_id, app in apps.items() for tag in app["collection_ids"]]
+    return enqueue(conn, jobs, now=now)
+
+
+def claim(conn, owner, lease_seconds=None, now=None):
+    """
+    Lease the next job: the longest-waiting queued one, or one whose lease expired.
+    Returns (app_id, tag), or None if there is nothing to do.
+    """
+    now = now if now is not None else time.time()
+    lease_seconds = lease_seconds or config.WORK_LEASE_SECONDS
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            """
+            SELECT app_id, tag, state, owner FROM jobs
+            WHERE state = ? OR (state = ? AND lease_expires < ?)
+            ORDER BY updated LIMIT 1
+            """,
+            (STATE_QUEUED, STATE_LEASED, now)).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        if row["state"] == STATE_LEASED:
+            print(f"  ♻️ Reclaiming {row['app_id']}/{row['tag']} from {row['owner']} (lease expired)")
+        conn.execute(
+            """
+            UPDATE jobs SET state = ?, owner = ?, lease_expires = ?, attempts = attempts + 1, updated = ?
+            WHERE app_id = ? AND tag = ?
+            """,
+            (STATE_LEASED, owner, now + lease_seconds, now, row["app_id"], row["tag"]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row["app_id"], row["tag"]
+
+
+def heartbeat(conn, app_id, tag, owner, lease_seconds=None, now=None):
+    """Extend a held lease. Returns False if the job is no longer ours (lease expired and reclaimed)."""
+    now = now if now is not None else time.time()
+    lease_seconds = lease_seconds or config.WORK_LEASE_SECONDS
+    cur = conn.execute(
+        "UPDATE jobs SET lease_expires = ? WHERE app_id = ? AND tag = ? AND state = ? AND owner = ?",
+        (now + lease_seconds, str(app_id), tag, STATE_LEASED, owner))
+    return cur.rowcount == 1
+
+
+def complete(conn, app_id, tag, owner, now=None):
+    """Mark a leased job done. Returns False if the lease was lost in the meantime."""
+    now = now if now is not None else time.time()
+    cur = conn.execute(
+        """UPDATE jobs SET state = ?, owner = NULL, lease_expires = NULL, last_error = NULL, updated = ?
+           WHERE app_id = ? AND tag = ? AND state = ? AND owner = ?""",
+        (STATE_DONE, now, str(app_id), tag, STATE_LEASED, owner))
+    return cur.rowcount == 1
+
+
+def fail(conn, app_id, tag, owner, error, max_attempts=None, now=None):
+    """
+    Give a leased job back after an error: re-queued for another worker, or
+    parked as failed once it has been tried max_attempts times.
+    """
+    now = now if now is not None else time.time()
+    max_attempts = max_attempts or config.WORK_MAX_ATTEMPTS
+    conn.execute(
+        """UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                           owner = NULL, lease_expires = NULL, last_error = ?, updated = ?
+           WHERE app_id = ? AND tag = ? AND state = ? AND owner = ?""",
+        (max_attempts, STATE_FAILED, STATE_QUEUED, str(error)[:500], now,
+         str(app_id), tag, STATE_LEASED, owner))
+
+
+def release(conn, app_id, tag, owner, now=None):
+    """Hand a job back untouched (e.g. on Ctrl+C) without counting it as an attempt."""
+    now = now if now is not None else time.time()
+    conn.execute(
+        """UPDATE jobs SET state = ?, owner = NULL, lease_expires = NULL, attempts = MAX(attempts - 1, 0), updated = ?
+           WHERE app_id = ? AND tag = ? AND state = ? AND owner = ?""",
+        (STATE_QUEUED, now, str(app_id), tag, STATE_LEASED, owner))
+
+
+def counts(conn):
+    """Return { state: number of jobs }."""
+    return {r["state"]: r["n"] for r in conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state")}
+
+
+def git_lock(path=None, timeout=600):
+    """Lock held while committing to the repository (see collection_state.file_lock)."""
+    return file_lock(path or config.GIT_LOCK_PATH, timeout=timeout)
+
+
+class LeaseKeeper:
+    """Background heartbeat for one leased job; use as a context manager around the work."""
+
+    def __init__(self, app_id, tag, owner, path=None, interval=None):
+        self.app_id = app_id
+        self.tag = tag
+        self.owner = owner
+        self.path = path
+        self.interval = interval or config.WORK_HEARTBEAT_INTERVAL
+        self.lost = False
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"lease-{app_id}-{tag}", daemon=True)
+
+    def _run(self):
+        conn = connect(self.path)  # sqlite connections can't be shared across threads
+        try:
+            while not self.stop.wait(self.interval):
+                try:
+                    if not heartbeat(conn, self.app_id, self.tag, self.owner):
+                        self.lost = True
+                        print(f"  ⚠️ Lost the lease on {self.app_id}/{self.tag}")
+                        return
+                except sqlite3.Error as e:
+                    print(f"  Heartbeat failed: {e}")  # Retry next interval; the lease has slack
+        finally:
+            conn.close()
+
+    def check(self):
+        """Raise LeaseLost if another worker has taken the job over; pass as a process_tag stop check."""
+        if self.lost:
+            raise LeaseLost(f"Lost the lease on {self.app_id}/{self.tag}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join(timeout=10)
+        return False